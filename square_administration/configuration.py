@@ -1,11 +1,37 @@
+import json
 import os
 import sys
+from typing import List
 
-from square_authentication_helper import SquareAuthenticationHelper
 from square_commons import ConfigReader
-from square_database_helper import SquareDatabaseHelper
 from square_logger.main import SquareLogger
 
+from square_administration.utils.http_client import (
+    PooledSquareAuthenticationHelper,
+    PooledSquareDatabaseHelper,
+)
+
+
+def parse_config_bool(value: str) -> bool:
+    if value.strip().lower() in ("true", "1", "yes", "on"):
+        return True
+    if value.strip().lower() in ("false", "0", "no", "off"):
+        return False
+    raise ValueError(f"Invalid boolean: {value}")
+
+
+def parse_config_list(value: str) -> List[str]:
+    """
+    json list of strings, e.g. ["http://localhost:10111"].
+    """
+    parsed_value = json.loads(value)
+    if not isinstance(parsed_value, list) or not all(
+        isinstance(x, str) for x in parsed_value
+    ):
+        raise ValueError(f"Invalid list of strings: {value}")
+    return parsed_value
+
+
 try:
     config_file_path = os.path.join(
         os.path.dirname(os.path.abspath(__file__)), "data", "config.ini"
@@ -27,14 +53,14 @@ try:
     # environment
     config_str_host_ip = ldict_configuration["ENVIRONMENT"]["HOST_IP"]
     config_int_host_port = int(ldict_configuration["ENVIRONMENT"]["HOST_PORT"])
-    config_list_allow_origins = eval(
+    config_list_allow_origins = parse_config_list(
         ldict_configuration["ENVIRONMENT"]["ALLOW_ORIGINS"]
     )
     config_str_log_file_name = ldict_configuration["ENVIRONMENT"]["LOG_FILE_NAME"]
     config_str_admin_password_hash = ldict_configuration["ENVIRONMENT"][
         "ADMIN_PASSWORD_HASH"
     ]
-    config_list_admin_allowed_emails = eval(
+    config_list_admin_allowed_emails = parse_config_list(
         ldict_configuration["ENVIRONMENT"]["ADMIN_ALLOWED_EMAILS"]
     )
 
@@ -61,7 +87,7 @@ try:
     config_formatter_choice = ldict_configuration["SQUARE_LOGGER"]["FORMATTER_CHOICE"]
     if config_formatter_choice not in ("human_readable", "json"):
         raise ValueError(f"Invalid formatter choice: {config_formatter_choice}")
-    config_bool_enable_redaction = eval(
+    config_bool_enable_redaction = parse_config_bool(
         ldict_configuration["SQUARE_LOGGER"]["ENABLE_REDACTION"]
     )
     # ===========================================
@@ -94,6 +120,187 @@ try:
         ]
     )
     # ===========================================
+    # ===========================================
+    # server
+
+    config_int_server_workers = int(ldict_configuration["SERVER"]["WORKERS"])
+    if config_int_server_workers < 0:
+        raise ValueError(f"Invalid server workers: {config_int_server_workers}")
+    config_str_server_loop = ldict_configuration["SERVER"]["LOOP"]
+    if config_str_server_loop not in ("auto", "asyncio", "uvloop"):
+        raise ValueError(f"Invalid server loop: {config_str_server_loop}")
+    config_str_server_http = ldict_configuration["SERVER"]["HTTP"]
+    if config_str_server_http not in ("auto", "h11", "httptools"):
+        raise ValueError(f"Invalid server http: {config_str_server_http}")
+    config_int_server_backlog = int(ldict_configuration["SERVER"]["BACKLOG"])
+    config_int_server_timeout_keep_alive = int(
+        ldict_configuration["SERVER"]["TIMEOUT_KEEP_ALIVE"]
+    )
+    config_int_server_limit_concurrency = (
+        int(ldict_configuration["SERVER"]["LIMIT_CONCURRENCY"])
+        if ldict_configuration["SERVER"]["LIMIT_CONCURRENCY"]
+        else None
+    )
+    config_int_server_timeout_graceful_shutdown = (
+        int(ldict_configuration["SERVER"]["TIMEOUT_GRACEFUL_SHUTDOWN"])
+        if ldict_configuration["SERVER"]["TIMEOUT_GRACEFUL_SHUTDOWN"]
+        else None
+    )
+    # ===========================================
+    # ===========================================
+    # upstream
+
+    config_int_upstream_thread_pool_size = int(
+        ldict_configuration["UPSTREAM"]["THREAD_POOL_SIZE"]
+    )
+    if config_int_upstream_thread_pool_size < 1:
+        raise ValueError(
+            f"Invalid upstream thread pool size: {config_int_upstream_thread_pool_size}"
+        )
+    config_int_upstream_http_max_connections = int(
+        ldict_configuration["UPSTREAM"]["HTTP_MAX_CONNECTIONS"]
+    )
+    config_int_upstream_http_max_keepalive_connections = int(
+        ldict_configuration["UPSTREAM"]["HTTP_MAX_KEEPALIVE_CONNECTIONS"]
+    )
+    config_float_upstream_http_keepalive_expiry = float(
+        ldict_configuration["UPSTREAM"]["HTTP_KEEPALIVE_EXPIRY"]
+    )
+    config_float_upstream_http_timeout = float(
+        ldict_configuration["UPSTREAM"]["HTTP_TIMEOUT"]
+    )
+    config_bool_upstream_http2 = parse_config_bool(
+        ldict_configuration["UPSTREAM"]["HTTP2"]
+    )
+    config_float_user_lookup_batch_window = float(
+        ldict_configuration["UPSTREAM"]["USER_LOOKUP_BATCH_WINDOW"]
+    )
+    config_int_user_lookup_max_batch_size = int(
+        ldict_configuration["UPSTREAM"]["USER_LOOKUP_MAX_BATCH_SIZE"]
+    )
+    config_int_app_id_resolve_attempts = int(
+        ldict_configuration["UPSTREAM"]["APP_ID_RESOLVE_ATTEMPTS"]
+    )
+    config_float_app_id_resolve_backoff = float(
+        ldict_configuration["UPSTREAM"]["APP_ID_RESOLVE_BACKOFF"]
+    )
+    config_float_app_id_resolve_max_backoff = float(
+        ldict_configuration["UPSTREAM"]["APP_ID_RESOLVE_MAX_BACKOFF"]
+    )
+    config_str_app_id_snapshot_file_path = ldict_configuration["UPSTREAM"][
+        "APP_ID_SNAPSHOT_FILE_PATH"
+    ]
+    # ===========================================
+    # ===========================================
+    # authentication
+
+    config_str_secret_key_for_access_token = ldict_configuration["AUTHENTICATION"][
+        "SECRET_KEY_FOR_ACCESS_TOKEN"
+    ]
+    config_int_password_check_pool_size = int(
+        ldict_configuration["AUTHENTICATION"]["PASSWORD_CHECK_POOL_SIZE"]
+    )
+    config_int_password_check_queue_size = int(
+        ldict_configuration["AUTHENTICATION"]["PASSWORD_CHECK_QUEUE_SIZE"]
+    )
+    config_str_google_client_id = ldict_configuration["AUTHENTICATION"][
+        "GOOGLE_CLIENT_ID"
+    ]
+    config_str_google_signing_keys_source = ldict_configuration["AUTHENTICATION"][
+        "GOOGLE_SIGNING_KEYS_SOURCE"
+    ]
+    config_float_google_signing_keys_refresh_interval = float(
+        ldict_configuration["AUTHENTICATION"]["GOOGLE_SIGNING_KEYS_REFRESH_INTERVAL"]
+    )
+    # ===========================================
+    # ===========================================
+    # rate limit
+
+    config_int_rate_limit_ip_capacity = int(
+        ldict_configuration["RATE_LIMIT"]["IP_CAPACITY"]
+    )
+    config_float_rate_limit_ip_refill_rate = float(
+        ldict_configuration["RATE_LIMIT"]["IP_REFILL_RATE"]
+    )
+    config_int_rate_limit_username_capacity = int(
+        ldict_configuration["RATE_LIMIT"]["USERNAME_CAPACITY"]
+    )
+    config_float_rate_limit_username_refill_rate = float(
+        ldict_configuration["RATE_LIMIT"]["USERNAME_REFILL_RATE"]
+    )
+    config_int_rate_limit_max_keys = int(ldict_configuration["RATE_LIMIT"]["MAX_KEYS"])
+    # ===========================================
+    # ===========================================
+    # greeting
+
+    config_int_greeting_max_page_size = int(
+        ldict_configuration["GREETING"]["MAX_PAGE_SIZE"]
+    )
+    config_int_greeting_export_page_size = int(
+        ldict_configuration["GREETING"]["EXPORT_PAGE_SIZE"]
+    )
+    config_float_greeting_feed_poll_interval = float(
+        ldict_configuration["GREETING"]["FEED_POLL_INTERVAL"]
+    )
+    config_float_greeting_feed_heartbeat_interval = float(
+        ldict_configuration["GREETING"]["FEED_HEARTBEAT_INTERVAL"]
+    )
+    config_int_greeting_feed_queue_size = int(
+        ldict_configuration["GREETING"]["FEED_QUEUE_SIZE"]
+    )
+    config_float_greeting_stats_refresh_interval = float(
+        ldict_configuration["GREETING"]["STATS_REFRESH_INTERVAL"]
+    )
+    config_float_greeting_stats_rebuild_interval = float(
+        ldict_configuration["GREETING"]["STATS_REBUILD_INTERVAL"]
+    )
+    config_float_greeting_search_refresh_interval = float(
+        ldict_configuration["GREETING"]["SEARCH_REFRESH_INTERVAL"]
+    )
+    config_float_greeting_search_rebuild_interval = float(
+        ldict_configuration["GREETING"]["SEARCH_REBUILD_INTERVAL"]
+    )
+    config_int_greeting_delete_batch_size = int(
+        ldict_configuration["GREETING"]["DELETE_BATCH_SIZE"]
+    )
+    # ===========================================
+    # ===========================================
+    # cache
+
+    config_int_username_cache_max_size = int(
+        ldict_configuration["CACHE"]["USERNAME_CACHE_MAX_SIZE"]
+    )
+    config_float_username_cache_ttl = float(
+        ldict_configuration["CACHE"]["USERNAME_CACHE_TTL"]
+    )
+    config_int_greetings_response_cache_max_size = int(
+        ldict_configuration["CACHE"]["GREETINGS_RESPONSE_CACHE_MAX_SIZE"]
+    )
+    config_float_greetings_response_cache_ttl = float(
+        ldict_configuration["CACHE"]["GREETINGS_RESPONSE_CACHE_TTL"]
+    )
+    config_int_greetings_count_cache_max_size = int(
+        ldict_configuration["CACHE"]["GREETINGS_COUNT_CACHE_MAX_SIZE"]
+    )
+    config_float_greetings_count_cache_ttl = float(
+        ldict_configuration["CACHE"]["GREETINGS_COUNT_CACHE_TTL"]
+    )
+    config_float_greetings_count_refresh_interval = float(
+        ldict_configuration["CACHE"]["GREETINGS_COUNT_REFRESH_INTERVAL"]
+    )
+    config_int_access_token_cache_max_size = int(
+        ldict_configuration["CACHE"]["ACCESS_TOKEN_CACHE_MAX_SIZE"]
+    )
+    config_float_access_token_cache_ttl = float(
+        ldict_configuration["CACHE"]["ACCESS_TOKEN_CACHE_TTL"]
+    )
+    config_int_refresh_token_cache_max_size = int(
+        ldict_configuration["CACHE"]["REFRESH_TOKEN_CACHE_MAX_SIZE"]
+    )
+    config_float_refresh_token_cache_ttl = float(
+        ldict_configuration["CACHE"]["REFRESH_TOKEN_CACHE_TTL"]
+    )
+    # ===========================================
     # Initialize logger
     global_object_square_logger = SquareLogger(
         log_file_name=config_str_log_file_name,
@@ -104,12 +311,12 @@ try:
         enable_redaction=config_bool_enable_redaction,
     )
 
-    global_object_square_database_helper = SquareDatabaseHelper(
+    global_object_square_database_helper = PooledSquareDatabaseHelper(
         param_str_square_database_ip=config_str_square_database_ip,
         param_int_square_database_port=config_int_square_database_port,
         param_str_square_database_protocol=config_str_square_database_protocol,
     )
-    global_object_square_authentication_helper = SquareAuthenticationHelper(
+    global_object_square_authentication_helper = PooledSquareAuthenticationHelper(
         param_str_square_authentication_protocol=config_str_square_authentication_protocol,
         param_str_square_authentication_ip=config_str_square_authentication_ip,
         param_int_square_authentication_port=config_int_square_authentication_port,
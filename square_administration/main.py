@@ -1,3 +1,6 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -12,47 +15,115 @@ from square_administration.configuration import (
     config_str_ssl_key_file_path,
     config_str_ssl_crt_file_path,
     config_list_allow_origins,
+    config_int_upstream_http_max_connections,
+    config_int_upstream_http_max_keepalive_connections,
+    config_float_upstream_http_keepalive_expiry,
+    config_float_upstream_http_timeout,
+    config_bool_upstream_http2,
+    config_int_server_workers,
+    config_str_server_loop,
+    config_str_server_http,
+    config_int_server_backlog,
+    config_int_server_timeout_keep_alive,
+    config_int_server_limit_concurrency,
+    config_int_server_timeout_graceful_shutdown,
 )
 from square_administration.routes import core, authentication
-from square_administration.utils.common import is_https
-
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=config_list_allow_origins,
-    allow_methods=["*"],
-    allow_headers=["*"],
+from square_administration.utils.common import load_app_id
+from square_administration.utils.greeting_feed import global_object_greeting_feed
+from square_administration.utils.greeting_search import (
+    global_object_greeting_search_index,
+)
+from square_administration.utils.http_client import (
+    close_http_client,
+    open_http_client,
 )
+from square_administration.utils.settings import (
+    add_reload_signal_handler,
+    get_settings,
+    remove_reload_signal_handler,
+)
+
 
-app.include_router(core.router)
-app.include_router(authentication.router)
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await open_http_client(
+        max_connections=config_int_upstream_http_max_connections,
+        max_keepalive_connections=config_int_upstream_http_max_keepalive_connections,
+        keepalive_expiry=config_float_upstream_http_keepalive_expiry,
+        timeout=config_float_upstream_http_timeout,
+        http2=config_bool_upstream_http2,
+    )
+    app_id_refresh_task = await load_app_id()
+    is_reload_signal_handler_added = add_reload_signal_handler()
+    # build the search index while the app already serves requests.
+    search_index_task = global_object_greeting_search_index.start_refresh()
+    try:
+        yield
+    finally:
+        if is_reload_signal_handler_added:
+            remove_reload_signal_handler()
+        search_index_task.cancel()
+        if app_id_refresh_task is not None:
+            app_id_refresh_task.cancel()
+        await global_object_greeting_feed.close()
+        await close_http_client()
 
 
-@app.get("/")
 @global_object_square_logger.auto_logger()
 async def root():
     output_content = get_api_output_in_standard_format(log=config_str_module_name)
     return JSONResponse(status_code=status.HTTP_200_OK, content=output_content)
 
 
+def create_app() -> FastAPI:
+    """
+    app factory, also used by uvicorn to build the app in every worker process.
+    """
+    local_object_app = FastAPI(lifespan=lifespan)
+
+    local_object_app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=config_list_allow_origins,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    local_object_app.include_router(core.router)
+    local_object_app.include_router(authentication.router)
+    local_object_app.add_api_route("/", root, methods=["GET"])
+    return local_object_app
+
+
+# only kept for uvicorn square_administration.main:app and the tests,
+# python -m square_administration.main serves the apps built by create_app() instead.
+app = create_app()
+
+
 if __name__ == "__main__":
     try:
-        if is_https():
-            run(
-                app,
-                host=config_str_host_ip,
-                port=config_int_host_port,
-                ssl_certfile=config_str_ssl_crt_file_path,
-                ssl_keyfile=config_str_ssl_key_file_path,
-            )
-        else:
-            run(
-                app,
-                host=config_str_host_ip,
-                port=config_int_host_port,
-            )
+        local_dict_ssl_options = {}
+        if get_settings().is_https:
+            local_dict_ssl_options = {
+                "ssl_certfile": config_str_ssl_crt_file_path,
+                "ssl_keyfile": config_str_ssl_key_file_path,
+            }
+        # every worker process builds its own app (and in-process caches) from the factory.
+        run(
+            "square_administration.main:create_app",
+            factory=True,
+            host=config_str_host_ip,
+            port=config_int_host_port,
+            workers=config_int_server_workers or os.cpu_count(),
+            loop=config_str_server_loop,
+            http=config_str_server_http,
+            backlog=config_int_server_backlog,
+            timeout_keep_alive=config_int_server_timeout_keep_alive,
+            limit_concurrency=config_int_server_limit_concurrency,
+            timeout_graceful_shutdown=config_int_server_timeout_graceful_shutdown,
+            **local_dict_ssl_options,
+        )
 
     except Exception as exc:
         global_object_square_logger.logger.critical(exc, exc_info=True)
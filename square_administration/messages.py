@@ -12,6 +12,9 @@ messages = {
     "GENERIC_500": "an internal server error occurred. please try again later.",
     "INCORRECT_ACCESS_TOKEN": "the access token provided is invalid or expired.",
     "INCORRECT_REFRESH_TOKEN": "the refresh token provided is invalid or expired.",
+    "INCORRECT_GOOGLE_ID": "the google sign in token is invalid or expired.",
     "REFRESH_TOKEN_NOT_FOUND": "refresh token not found. please login again.",
     "UNAUTHORIZED": "your account is not authorized for this action.",
+    "SERVER_BUSY": "the server is busy. please try again in a moment.",
+    "TOO_MANY_REQUESTS": "too many attempts. please wait a moment and try again.",
 }
@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import AwareDatetime, BaseModel, Field
 from square_database_structure.square.greeting.tables import Greeting
 
 
@@ -8,20 +8,112 @@ class GetAllGreetingsV0(BaseModel):
     order_by: List[str] = Field(
         default_factory=lambda: [f"-{Greeting.greeting_datetime.name}"]
     )
-    limit: Optional[int] = None
-    offset: int = 0
+    # capped at GREETING.MAX_PAGE_SIZE, None means the maximum page size.
+    limit: Optional[int] = Field(default=None, ge=1)
+    # kept for backward compatibility, prefer cursor.
+    offset: int = Field(default=0, ge=0)
+    # next_cursor from the previous page,
+    # only valid when ordering by greeting_datetime (and greeting_id).
+    cursor: Optional[str] = None
+    # optional filters, applied by square_database.
+    greeting_is_anonymous: Optional[bool] = None
+    user_id: Optional[str] = None
+    # greeting_datetime_from <= greeting_datetime < greeting_datetime_to.
+    greeting_datetime_from: Optional[AwareDatetime] = None
+    greeting_datetime_to: Optional[AwareDatetime] = None
+    # subset of GetAllGreetingsV0ResponseMain fields to return, None means all.
+    # greeting_id is always returned.
+    fields: Optional[List[str]] = None
+    # exact: count on every page, approximate: last known count refreshed in the
+    # background (exact on first pages), none: total_count is null.
+    total_count_mode: Literal["exact", "approximate", "none"] = "exact"
 
 
 class GetAllGreetingsV0ResponseMain(BaseModel):
-    greeting_anonymous_sender_name: str | None
-    user_id: str | None
+    # every field except greeting_id may be left out through GetAllGreetingsV0.fields.
+    greeting_anonymous_sender_name: str | None = None
+    user_id: str | None = None
     greeting_id: int
-    greeting_datetime: str
-    greeting_is_anonymous: bool
-    greeting_text: str | None
-    user_username: str | None
+    greeting_datetime: str | None = None
+    greeting_is_anonymous: bool | None = None
+    greeting_text: str | None = None
+    user_username: str | None = None
 
 
 class GetAllGreetingsV0Response(BaseModel):
     main: List[GetAllGreetingsV0ResponseMain]
+    total_count: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class CacheStatsV0(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+
+
+class GetCacheStatsV0Response(BaseModel):
+    main: Dict[str, CacheStatsV0]
+
+
+class GreetingSenderV0(BaseModel):
+    user_id: str
+    user_username: str | None
+    greeting_count: int
+
+
+class GreetingStatsV0(BaseModel):
     total_count: int
+    anonymous_count: int
+    named_count: int
+    # utc date -> greeting count.
+    per_day: Dict[str, int]
+    # iso week (YYYY-Www) -> greeting count.
+    per_week: Dict[str, int]
+    top_senders: List[GreetingSenderV0]
+    last_greeting_id: int
+
+
+class GetGreetingStatsV0Response(BaseModel):
+    main: GreetingStatsV0
+
+
+class SearchGreetingsV0(BaseModel):
+    # words matched case-insensitively against greeting_text and
+    # greeting_anonymous_sender_name, all of them have to match.
+    query: str = Field(min_length=1)
+    # capped at GREETING.MAX_PAGE_SIZE, None means the maximum page size.
+    limit: Optional[int] = Field(default=None, ge=1)
+    offset: int = Field(default=0, ge=0)
+
+
+class SearchGreetingsV0ResponseMain(GetAllGreetingsV0ResponseMain):
+    score: float
+
+
+class SearchGreetingsV0Response(BaseModel):
+    main: List[SearchGreetingsV0ResponseMain]
+    total_count: int
+
+
+class DeleteGreetingsV0(BaseModel):
+    # either greeting_ids or at least one of the filters below.
+    greeting_ids: Optional[List[int]] = None
+    greeting_is_anonymous: Optional[bool] = None
+    user_id: Optional[str] = None
+    # greeting_datetime_from <= greeting_datetime < greeting_datetime_to.
+    greeting_datetime_from: Optional[AwareDatetime] = None
+    greeting_datetime_to: Optional[AwareDatetime] = None
+
+
+class DeleteGreetingsV0Batch(BaseModel):
+    requested_count: int
+    deleted_count: int
+    # error of a failed batch, the remaining batches are still attempted.
+    log: Optional[str] = None
+
+
+class DeleteGreetingsV0Response(BaseModel):
+    main: List[DeleteGreetingsV0Batch]
+    deleted_count: int
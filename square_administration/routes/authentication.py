@@ -1,6 +1,6 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Header, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from square_commons import get_api_output_in_standard_format
 from square_commons.api_utils import StandardResponse
@@ -36,6 +36,7 @@ from square_administration.utils.routes.authentication import (
     util_update_password_v0,
     util_register_login_google_v0,
 )
+from square_administration.utils.token import get_refresh_token
 
 router = APIRouter(
     tags=["authentication"],
@@ -49,10 +50,12 @@ router = APIRouter(
 )
 @global_object_square_logger.auto_logger()
 async def register_username_v0(
+    request: Request,
     body: RegisterUsernameV0,
 ):
     try:
-        return util_register_username_v0(
+        return await util_register_username_v0(
+            request=request,
             body=body,
         )
     except HTTPException as he:
@@ -75,10 +78,12 @@ async def register_username_v0(
 )
 @global_object_square_logger.auto_logger()
 async def login_username_v0(
+    request: Request,
     body: LoginUsernameV0,
 ):
     try:
-        return util_login_username_v0(
+        return await util_login_username_v0(
+            request=request,
             body=body,
         )
     except HTTPException as he:
@@ -105,7 +110,7 @@ async def remove_app_for_self_v0(
     body: RemoveAppForSelfV0,
 ):
     try:
-        return util_remove_app_for_self_v0(
+        return await util_remove_app_for_self_v0(
             body=body,
             access_token=access_token,
         )
@@ -128,10 +133,12 @@ async def remove_app_for_self_v0(
     response_model=LogoutV0Response,
 )
 @global_object_square_logger.auto_logger()
-async def logout_v0(request: Request):
+async def logout_v0(
+    refresh_token: Annotated[Optional[str], Depends(get_refresh_token)],
+):
     try:
-        return util_logout_v0(
-            request=request,
+        return await util_logout_v0(
+            refresh_token=refresh_token,
         )
     except HTTPException as he:
         global_object_square_logger.logger.error(he, exc_info=True)
@@ -153,11 +160,11 @@ async def logout_v0(request: Request):
 )
 @global_object_square_logger.auto_logger()
 async def generate_access_token_v0(
-    request: Request,
+    refresh_token: Annotated[Optional[str], Depends(get_refresh_token)],
 ):
     try:
-        return util_generate_access_token_v0(
-            request=request,
+        return await util_generate_access_token_v0(
+            refresh_token=refresh_token,
         )
     except HTTPException as he:
         global_object_square_logger.logger.error(he, exc_info=True)
@@ -179,10 +186,12 @@ async def generate_access_token_v0(
 )
 @global_object_square_logger.auto_logger()
 async def reset_password_and_login_using_backup_code_v0(
+    request: Request,
     body: ResetPasswordAndLoginUsingBackupCodeV0,
 ):
     try:
-        return util_reset_password_and_login_using_backup_code_v0(
+        return await util_reset_password_and_login_using_backup_code_v0(
+            request=request,
             body=body,
         )
     except HTTPException as he:
@@ -205,10 +214,12 @@ async def reset_password_and_login_using_backup_code_v0(
 )
 @global_object_square_logger.auto_logger()
 async def reset_password_and_login_using_reset_email_code_v0(
+    request: Request,
     body: ResetPasswordAndLoginUsingResetEmailCodeV0,
 ):
     try:
-        return util_reset_password_and_login_using_reset_email_code_v0(
+        return await util_reset_password_and_login_using_reset_email_code_v0(
+            request=request,
             body=body,
         )
     except HTTPException as he:
@@ -231,13 +242,13 @@ async def reset_password_and_login_using_reset_email_code_v0(
 )
 @global_object_square_logger.auto_logger()
 async def update_password_v0(
-    request: Request,
+    refresh_token: Annotated[Optional[str], Depends(get_refresh_token)],
     body: UpdatePasswordV0,
     access_token: Annotated[str, Header()],
 ):
     try:
-        return util_update_password_v0(
-            request=request,
+        return await util_update_password_v0(
+            refresh_token=refresh_token,
             body=body,
             access_token=access_token,
         )
@@ -260,9 +271,10 @@ async def update_password_v0(
     response_model=RegisterLoginGoogleV0Response,
 )
 @global_object_square_logger.auto_logger()
-async def register_login_google_v0(body: RegisterLoginGoogleV0):
+async def register_login_google_v0(request: Request, body: RegisterLoginGoogleV0):
     try:
-        return util_register_login_google_v0(
+        return await util_register_login_google_v0(
+            request=request,
             body=body,
         )
     except HTTPException as he:
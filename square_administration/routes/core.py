@@ -1,16 +1,30 @@
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 
-from fastapi import APIRouter, Header, status, HTTPException
+from fastapi import APIRouter, Header, Query, status, HTTPException
 from fastapi.responses import JSONResponse
 from square_administration.configuration import (
     global_object_square_logger,
 )
 from square_administration.messages import messages
 from square_administration.pydantic_models.core import (
+    DeleteGreetingsV0,
+    DeleteGreetingsV0Response,
     GetAllGreetingsV0,
     GetAllGreetingsV0Response,
+    GetCacheStatsV0Response,
+    GetGreetingStatsV0Response,
+    SearchGreetingsV0,
+    SearchGreetingsV0Response,
+)
+from square_administration.utils.routes.core import (
+    util_delete_greetings_v0,
+    util_export_greetings_v0,
+    util_get_all_greetings_v0,
+    util_get_cache_stats_v0,
+    util_get_greeting_stats_v0,
+    util_get_greetings_feed_v0,
+    util_search_greetings_v0,
 )
-from square_administration.utils.routes.core import util_get_all_greetings_v0
 from square_commons import get_api_output_in_standard_format
 from square_commons.api_utils import StandardResponse
 
@@ -26,10 +40,173 @@ router = APIRouter(
 )
 @global_object_square_logger.auto_logger()
 async def get_all_greetings_v0(
-    access_token: Annotated[str, Header()], body: GetAllGreetingsV0
+    access_token: Annotated[str, Header()],
+    body: GetAllGreetingsV0,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    try:
+        return await util_get_all_greetings_v0(
+            access_token=access_token,
+            body=body,
+            if_none_match=if_none_match,
+        )
+    except HTTPException as he:
+        global_object_square_logger.logger.error(he, exc_info=True)
+        return JSONResponse(status_code=he.status_code, content=he.detail)
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@router.get(
+    "/get_cache_stats/v0",
+    status_code=status.HTTP_200_OK,
+    response_model=StandardResponse[GetCacheStatsV0Response],
+)
+@global_object_square_logger.auto_logger()
+async def get_cache_stats_v0(access_token: Annotated[str, Header()]):
+    try:
+        return await util_get_cache_stats_v0(
+            access_token=access_token,
+        )
+    except HTTPException as he:
+        global_object_square_logger.logger.error(he, exc_info=True)
+        return JSONResponse(status_code=he.status_code, content=he.detail)
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@router.get(
+    "/export_greetings/v0",
+    status_code=status.HTTP_200_OK,
+)
+@global_object_square_logger.auto_logger()
+async def export_greetings_v0(
+    access_token: Annotated[str, Header()],
+    export_format: Literal["ndjson", "csv"] = "ndjson",
+):
+    try:
+        return await util_export_greetings_v0(
+            access_token=access_token,
+            export_format=export_format,
+        )
+    except HTTPException as he:
+        global_object_square_logger.logger.error(he, exc_info=True)
+        return JSONResponse(status_code=he.status_code, content=he.detail)
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@router.get(
+    "/get_greetings_feed/v0",
+    status_code=status.HTTP_200_OK,
+)
+@global_object_square_logger.auto_logger()
+async def get_greetings_feed_v0(
+    access_token: Annotated[Optional[str], Header()] = None,
+    # browser EventSource cannot send headers, it passes the token in the url instead.
+    access_token_query: Annotated[Optional[str], Query(alias="access_token")] = None,
+):
+    try:
+        return await util_get_greetings_feed_v0(
+            access_token=access_token or access_token_query,
+        )
+    except HTTPException as he:
+        global_object_square_logger.logger.error(he, exc_info=True)
+        return JSONResponse(status_code=he.status_code, content=he.detail)
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@router.get(
+    "/get_greeting_stats/v0",
+    status_code=status.HTTP_200_OK,
+    response_model=StandardResponse[GetGreetingStatsV0Response],
+)
+@global_object_square_logger.auto_logger()
+async def get_greeting_stats_v0(
+    access_token: Annotated[str, Header()],
+    top_senders_limit: int = 10,
+):
+    try:
+        return await util_get_greeting_stats_v0(
+            access_token=access_token,
+            top_senders_limit=top_senders_limit,
+        )
+    except HTTPException as he:
+        global_object_square_logger.logger.error(he, exc_info=True)
+        return JSONResponse(status_code=he.status_code, content=he.detail)
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@router.post(
+    "/search_greetings/v0",
+    status_code=status.HTTP_200_OK,
+    response_model=StandardResponse[SearchGreetingsV0Response],
+)
+@global_object_square_logger.auto_logger()
+async def search_greetings_v0(
+    access_token: Annotated[str, Header()], body: SearchGreetingsV0
+):
+    try:
+        return await util_search_greetings_v0(
+            access_token=access_token,
+            body=body,
+        )
+    except HTTPException as he:
+        global_object_square_logger.logger.error(he, exc_info=True)
+        return JSONResponse(status_code=he.status_code, content=he.detail)
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@router.post(
+    "/delete_greetings/v0",
+    status_code=status.HTTP_200_OK,
+    response_model=StandardResponse[DeleteGreetingsV0Response],
+)
+@global_object_square_logger.auto_logger()
+async def delete_greetings_v0(
+    access_token: Annotated[str, Header()], body: DeleteGreetingsV0
 ):
     try:
-        return util_get_all_greetings_v0(
+        return await util_delete_greetings_v0(
             access_token=access_token,
             body=body,
         )
@@ -0,0 +1,138 @@
+import asyncio
+import functools
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
+
+
+class BatchLoader:
+    """
+    coalesce keys requested by concurrent callers within `window` seconds
+    into `batch_load` calls of at most `max_batch_size` keys (dataloader style).
+    `batch_load` receives the list of keys and returns a dict of the keys it found.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        window: float,
+        max_batch_size: int,
+    ):
+        self.batch_load = batch_load
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batch_count = 0
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._dispatch_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        returns the found entries, keys unknown to `batch_load` are left out.
+        """
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for key in set(keys):
+            # join a batch that is already waiting or in flight for this key.
+            future = self._in_flight.get(key) or self._pending.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._pending[key] = future
+            futures[key] = future
+        if not futures:
+            return {}
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._pending and self._dispatch_handle is None:
+            self._dispatch_handle = loop.call_later(self.window, self._dispatch)
+        # shield so a cancelled caller does not cancel a future shared with others.
+        results = await asyncio.gather(
+            *(asyncio.shield(future) for future in futures.values())
+        )
+        return {
+            key: value for key, (found, value) in zip(futures.keys(), results) if found
+        }
+
+    def _dispatch(self) -> None:
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+        pending = list(self._pending.items())
+        self._pending = {}
+        # one caller can bring more than max_batch_size keys, split them up.
+        for index in range(0, len(pending), self.max_batch_size):
+            batch = dict(pending[index : index + self.max_batch_size])
+            self.batch_count += 1
+            self._in_flight.update(batch)
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, pending: Dict[Hashable, asyncio.Future]) -> None:
+        try:
+            loaded = await self.batch_load(list(pending.keys()))
+        except Exception as error:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        else:
+            for key, future in pending.items():
+                if not future.done():
+                    future.set_result((key in loaded, loaded.get(key)))
+        finally:
+            for key, future in pending.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+
+class SingleFlight:
+    """
+    concurrent callers asking for the same key share one execution of `func`
+    and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self.call_count = 0
+        self.shared_count = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    def _get_task(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        task = self._in_flight.get(key)
+        if task is None:
+            self.call_count += 1
+            task = asyncio.get_running_loop().create_task(func())
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        else:
+            self.shared_count += 1
+        return task
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        # shield so a cancelled caller does not cancel the execution shared with others.
+        return await asyncio.shield(self._get_task(key, func))
+
+    def start(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> None:
+        """
+        run `func` in the background unless an execution for `key` is already in flight.
+        """
+        if key not in self._in_flight:
+            self._get_task(key, func)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # mark the exception as retrieved in case every caller went away.
+            task.exception()
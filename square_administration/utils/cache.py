@@ -0,0 +1,137 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from fastapi import Response, status
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    bounded in-process LRU cache with a time to live per entry.
+    safe to share between the event loop and worker threads.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        if max_size < 1:
+            raise ValueError(f"Invalid cache max_size: {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: Hashable, now: float) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self.misses += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._get(key, time.monotonic())
+        return default if value is _MISSING else value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], List]:
+        """
+        returns (found entries, missing keys).
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                value = self._get(key, now)
+                if value is _MISSING:
+                    missing.append(key)
+                else:
+                    found[key] = value
+        return found, missing
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + (self.ttl if ttl is None else ttl),
+                value,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def set_many(self, entries: Dict[Hashable, Any]) -> None:
+        for key, value in entries.items():
+            self.set(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    content: bytes
+
+
+def get_cached_response(content: bytes) -> CachedResponse:
+    """
+    wrap serialized json with a strong etag derived from its bytes.
+    """
+    return CachedResponse(
+        etag='"' + hashlib.sha256(content).hexdigest()[:32] + '"',
+        content=content,
+    )
+
+
+def is_etag_match(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses the weak comparison.
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def get_conditional_json_response(
+    cached_response: CachedResponse,
+    if_none_match: Optional[str],
+    status_code: int = status.HTTP_200_OK,
+) -> Response:
+    """
+    304 without a body when the client already has this version, the json otherwise.
+    """
+    headers = {"ETag": cached_response.etag, "Cache-Control": "private, no-cache"}
+    if is_etag_match(if_none_match, cached_response.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=cached_response.content,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
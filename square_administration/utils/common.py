@@ -1,5 +1,10 @@
+import asyncio
+import json
 import os
+from datetime import datetime
+from typing import Optional
 
+from square_commons.api_utils import create_cookie
 from square_database_helper import FiltersV0
 from square_database_helper.pydantic_models import FilterConditionsV0
 from square_database_structure.square import global_string_database_name
@@ -7,31 +12,164 @@ from square_database_structure.square.public import global_string_schema_name
 from square_database_structure.square.public.tables import App
 
 from square_administration.configuration import (
-    config_str_ssl_key_file_path,
-    config_str_ssl_crt_file_path,
+    config_float_app_id_resolve_backoff,
+    config_float_app_id_resolve_max_backoff,
+    config_int_app_id_resolve_attempts,
+    config_str_app_id_snapshot_file_path,
     global_object_square_logger,
     global_object_square_database_helper,
     config_str_app_name,
 )
+from square_administration.utils.concurrency import run_in_upstream_thread_pool
+from square_administration.utils.settings import get_settings
 
+# app id of APP_NAME and the matching refresh token cookie name,
+# set in the lifespan by load_app_id().
+_app_id: Optional[int] = None
+_refresh_token_cookie_key: Optional[str] = None
 
-@global_object_square_logger.auto_logger()
-def is_https() -> bool:
-    return os.path.exists(config_str_ssl_key_file_path) and os.path.exists(
-        config_str_ssl_crt_file_path
+
+def get_app_id() -> int:
+    if _app_id is None:
+        raise RuntimeError("app id is not resolved yet, see load_app_id.")
+    return _app_id
+
+
+def get_refresh_token_cookie_key() -> str:
+    if _refresh_token_cookie_key is None:
+        raise RuntimeError("app id is not resolved yet, see load_app_id.")
+    return _refresh_token_cookie_key
+
+
+def _set_app_id(app_id: int) -> None:
+    global _app_id, _refresh_token_cookie_key
+    _app_id = app_id
+    _refresh_token_cookie_key = "refresh_token|" + str(app_id)
+
+
+def create_refresh_token_cookie(
+    refresh_token: str, refresh_token_expiry_time: str
+) -> dict:
+    """
+    set_cookie arguments for the refresh token of this app.
+    """
+    settings = get_settings()
+    return create_cookie(
+        key=get_refresh_token_cookie_key(),
+        value=refresh_token,
+        domain=settings.cookie_domain,
+        expires=datetime.fromisoformat(refresh_token_expiry_time),
+        secure=settings.is_https,
+        http_only=True,
+    )
+
+
+async def _fetch_app_id() -> int:
+    response = await run_in_upstream_thread_pool(
+        global_object_square_database_helper.get_rows_v0,
+        database_name=global_string_database_name,
+        schema_name=global_string_schema_name,
+        table_name=App.__tablename__,
+        filters=FiltersV0(
+            root={
+                App.app_name.name: FilterConditionsV0(eq=config_str_app_name),
+            }
+        ),
+        columns=[App.app_id.name],
+        response_as_pydantic=True,
     )
+    if not response.data.main:
+        raise LookupError(f"app {config_str_app_name} not found in square_database.")
+    return response.data.main[0][App.app_id.name]
+
+
+async def _fetch_app_id_with_retry() -> int:
+    """
+    up to APP_ID_RESOLVE_ATTEMPTS attempts with exponential backoff,
+    the last error is raised once they are used up.
+    """
+    backoff = config_float_app_id_resolve_backoff
+    attempt = 1
+    while True:
+        try:
+            return await _fetch_app_id()
+        except Exception as e:
+            if attempt >= config_int_app_id_resolve_attempts:
+                raise
+            global_object_square_logger.logger.warning(
+                f"resolving app id failed (attempt {attempt}), "
+                f"retrying in {backoff} seconds: {e}"
+            )
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, config_float_app_id_resolve_max_backoff)
+        attempt += 1
+
+
+def _read_app_id_snapshot() -> Optional[int]:
+    if not config_str_app_id_snapshot_file_path:
+        return None
+    try:
+        with open(config_str_app_id_snapshot_file_path) as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        global_object_square_logger.logger.warning(
+            f"ignoring unreadable app id snapshot: {e}"
+        )
+        return None
+    if (
+        not isinstance(snapshot, dict)
+        or snapshot.get("app_name") != config_str_app_name
+    ):
+        return None
+    app_id = snapshot.get("app_id")
+    return app_id if isinstance(app_id, int) else None
+
+
+def _write_app_id_snapshot(app_id: int) -> None:
+    if not config_str_app_id_snapshot_file_path:
+        return
+    temporary_file_path = f"{config_str_app_id_snapshot_file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_file_path, "w") as snapshot_file:
+            json.dump(
+                {"app_name": config_str_app_name, "app_id": app_id}, snapshot_file
+            )
+        # replace in one step so other workers never read a partial file.
+        os.replace(temporary_file_path, config_str_app_id_snapshot_file_path)
+    except OSError as e:
+        global_object_square_logger.logger.warning(
+            f"could not write app id snapshot: {e}"
+        )
+
+
+async def _refresh_app_id() -> None:
+    app_id = await _fetch_app_id_with_retry()
+    _set_app_id(app_id)
+    _write_app_id_snapshot(app_id)
+
+
+async def _refresh_app_id_in_background() -> None:
+    try:
+        await _refresh_app_id()
+    except Exception as e:
+        global_object_square_logger.logger.error(
+            f"could not refresh app id, keeping the snapshot value {_app_id}: {e}",
+            exc_info=True,
+        )
 
 
-# get app id
-global_int_app_id = global_object_square_database_helper.get_rows_v0(
-    database_name=global_string_database_name,
-    schema_name=global_string_schema_name,
-    table_name=App.__tablename__,
-    filters=FiltersV0(
-        root={
-            App.app_name.name: FilterConditionsV0(eq=config_str_app_name),
-        }
-    ),
-    columns=[App.app_id.name],
-    response_as_pydantic=True,
-).data.main[0][App.app_id.name]
+async def load_app_id() -> Optional[asyncio.Task]:
+    """
+    to be awaited in the lifespan before any request is served.
+    with a snapshot from a previous start the app id is set right away and refreshed
+    from square_database in the background (the returned task), otherwise it is read
+    from square_database with retry and startup fails once the attempts are used up.
+    """
+    snapshot_app_id = _read_app_id_snapshot()
+    if snapshot_app_id is None:
+        await _refresh_app_id()
+        return None
+    _set_app_id(snapshot_app_id)
+    return asyncio.get_running_loop().create_task(_refresh_app_id_in_background())
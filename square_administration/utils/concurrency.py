@@ -0,0 +1,61 @@
+import functools
+from typing import Any, Callable, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+
+from square_administration.configuration import config_int_upstream_thread_pool_size
+
+T = TypeVar("T")
+
+global_object_upstream_capacity_limiter = CapacityLimiter(
+    config_int_upstream_thread_pool_size
+)
+
+
+async def run_in_upstream_thread_pool(
+    func: Callable[..., T], /, *args: Any, **kwargs: Any
+) -> T:
+    """
+    run a blocking upstream call (square_database_helper / square_authentication_helper)
+    in a worker thread so the event loop stays free while waiting on the network.
+    the number of concurrent calls is bounded by UPSTREAM.THREAD_POOL_SIZE.
+    """
+    return await to_thread.run_sync(
+        functools.partial(func, *args, **kwargs),
+        limiter=global_object_upstream_capacity_limiter,
+    )
+
+
+class PoolFullError(Exception):
+    pass
+
+
+class BoundedThreadPool:
+    """
+    worker threads bounded by `size` with at most `queue_size` callers waiting,
+    further callers are rejected right away instead of queueing without bound.
+    """
+
+    def __init__(self, size: int, queue_size: int):
+        if size < 1:
+            raise ValueError(f"Invalid pool size: {size}")
+        self.capacity_limiter = CapacityLimiter(size)
+        self.max_admitted_count = size + queue_size
+        # running + waiting, only touched from the event loop.
+        self.admitted_count = 0
+        self.rejected_count = 0
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        if self.admitted_count >= self.max_admitted_count:
+            self.rejected_count += 1
+            raise PoolFullError(
+                f"{self.admitted_count} calls already running or waiting."
+            )
+        self.admitted_count += 1
+        try:
+            return await to_thread.run_sync(
+                functools.partial(func, *args, **kwargs),
+                limiter=self.capacity_limiter,
+            )
+        finally:
+            self.admitted_count -= 1
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import time
+from typing import Dict, Optional
+
+import httpx
+import jwt
+from anyio import to_thread
+from fastapi import HTTPException, status
+from square_commons import get_api_output_in_standard_format
+
+from square_administration.configuration import (
+    config_float_google_signing_keys_refresh_interval,
+    config_str_google_client_id,
+    config_str_google_signing_keys_source,
+    global_object_square_logger,
+)
+from square_administration.messages import messages
+from square_administration.utils import http_client
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# an unknown kid reloads the key set at most this often (seconds).
+_MIN_RELOAD_INTERVAL = 60
+
+
+def _read_json_file(file_path: str) -> dict:
+    with open(file_path, "r") as file:
+        return json.load(file)
+
+
+class GoogleSigningKeys:
+    """
+    google's RS256 public keys (jwks) from an https url or a local file,
+    cached for `refresh_interval` seconds and reloaded early for an unknown kid.
+    """
+
+    def __init__(self, source: str, refresh_interval: float):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.load_count = 0
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def _read_source(self) -> dict:
+        if not self.source.startswith(("https://", "http://")):
+            return await to_thread.run_sync(_read_json_file, self.source)
+        if http_client.global_object_http_client is not None:
+            response = await http_client.global_object_http_client.get(self.source)
+        else:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(self.source)
+        response.raise_for_status()
+        return response.json()
+
+    async def _load(self) -> None:
+        self.load_count += 1
+        try:
+            jwks = await self._read_source()
+            self._keys = {
+                key["kid"]: jwt.PyJWK(key, algorithm="RS256")
+                for key in jwks["keys"]
+                if key.get("kty") == "RSA"
+            }
+        except Exception as e:
+            if not self._keys:
+                raise
+            # keep serving the previous keys until the next attempt.
+            global_object_square_logger.logger.error(e, exc_info=True)
+        self._loaded_at = time.monotonic()
+
+    def _is_reload_due(self, kid: str) -> bool:
+        if self._loaded_at is None:
+            return True
+        age = time.monotonic() - self._loaded_at
+        return age > self.refresh_interval or (
+            kid not in self._keys and age > _MIN_RELOAD_INTERVAL
+        )
+
+    async def get_key(self, kid: str) -> Optional[jwt.PyJWK]:
+        """
+        public key for kid, None when google does not know the kid.
+        """
+        if self._is_reload_due(kid):
+            async with self._lock:
+                if self._is_reload_due(kid):
+                    await self._load()
+        return self._keys.get(kid)
+
+
+global_object_google_signing_keys = GoogleSigningKeys(
+    source=config_str_google_signing_keys_source,
+    refresh_interval=config_float_google_signing_keys_refresh_interval,
+)
+
+
+def is_google_id_token_verification_enabled() -> bool:
+    return bool(config_str_google_client_id and config_str_google_signing_keys_source)
+
+
+def _raise_incorrect_google_id(log: str):
+    output_content = get_api_output_in_standard_format(
+        message=messages["INCORRECT_GOOGLE_ID"],
+        log=log,
+    )
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=output_content,
+    )
+
+
+async def verify_google_id_token(google_id: str) -> dict:
+    """
+    verify signature, issuer, audience, expiry and email_verified in process
+    and return the claims, raises HTTPException 401 otherwise.
+    """
+    try:
+        header = jwt.get_unverified_header(google_id)
+    except jwt.InvalidTokenError as error:
+        _raise_incorrect_google_id(f"malformed google id token: {error}.")
+    if header.get("alg") != "RS256" or not header.get("kid"):
+        _raise_incorrect_google_id("google id token is not signed with RS256.")
+    key = await global_object_google_signing_keys.get_key(header["kid"])
+    if key is None:
+        _raise_incorrect_google_id(f"unknown google signing key {header['kid']}.")
+    try:
+        claims = jwt.decode(
+            google_id,
+            key=key,
+            algorithms=["RS256"],
+            options={"require": ["exp", "iat", "aud", "iss", "email"]},
+            audience=config_str_google_client_id,
+            issuer=GOOGLE_ISSUERS,
+        )
+    except jwt.InvalidTokenError as error:
+        _raise_incorrect_google_id(f"invalid google id token: {error}.")
+    if claims.get("email_verified") is not True:
+        _raise_incorrect_google_id("google account email is not verified.")
+    return claims
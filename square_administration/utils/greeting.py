@@ -0,0 +1,382 @@
+import asyncio
+import functools
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from square_database_helper import FiltersV0
+from square_database_helper.pydantic_models import FilterConditionsV0
+from square_database_structure.square import global_string_database_name
+from square_database_structure.square.authentication.tables import User
+from square_database_structure.square.greeting import global_string_schema_name
+from square_database_structure.square.greeting.tables import Greeting
+
+from square_administration.configuration import (
+    config_float_greetings_count_cache_ttl,
+    config_float_greetings_count_refresh_interval,
+    config_float_greetings_response_cache_ttl,
+    config_int_greetings_count_cache_max_size,
+    config_int_greetings_response_cache_max_size,
+    global_object_square_database_helper,
+    global_object_square_logger,
+)
+from square_administration.utils.batching import SingleFlight
+from square_administration.utils.cache import TTLCache
+from square_administration.utils.concurrency import run_in_upstream_thread_pool
+from square_administration.utils.user import get_user_username_map
+
+# serialized get_all_greetings_v0 pages keyed by the normalized request body.
+global_object_greetings_response_cache = TTLCache(
+    max_size=config_int_greetings_response_cache_max_size,
+    ttl=config_float_greetings_response_cache_ttl,
+)
+
+# identical concurrent get_all_greetings_v0 requests share one page computation.
+global_object_greetings_page_single_flight = SingleFlight()
+
+# (counted at, count) per filter set for approximate total_count.
+global_object_greetings_count_cache = TTLCache(
+    max_size=config_int_greetings_count_cache_max_size,
+    ttl=config_float_greetings_count_cache_ttl,
+)
+global_object_greetings_count_single_flight = SingleFlight()
+
+
+# every IncrementalGreetingView registers itself to be reset on invalidation.
+global_list_incremental_greeting_views: List["IncrementalGreetingView"] = []
+
+
+# bumped by invalidate_greeting_caches(). a page or count computed across an
+# invalidation is not cached, and single-flight keys include it so requests after
+# an invalidation never join a computation started before it.
+_greetings_generation = 0
+
+
+def get_greetings_generation() -> int:
+    """
+    to be read before the upstream call whose result is cached.
+    """
+    return _greetings_generation
+
+
+def invalidate_greeting_caches() -> None:
+    """
+    to be called whenever greetings are added, edited or removed.
+    """
+    global _greetings_generation
+    _greetings_generation += 1
+    global_object_greetings_response_cache.invalidate_all()
+    global_object_greetings_count_cache.invalidate_all()
+    for incremental_greeting_view in global_list_incremental_greeting_views:
+        incremental_greeting_view.reset()
+
+
+async def get_greetings_after(
+    after_greeting_id: Optional[int], limit: int
+) -> List[Dict]:
+    """
+    up to `limit` greetings with greeting_id > after_greeting_id, in greeting_id order.
+    """
+    filters = {}
+    if after_greeting_id is not None:
+        filters[Greeting.greeting_id.name] = FilterConditionsV0(gt=after_greeting_id)
+    response = await run_in_upstream_thread_pool(
+        global_object_square_database_helper.get_rows_v0,
+        database_name=global_string_database_name,
+        schema_name=global_string_schema_name,
+        table_name=Greeting.__tablename__,
+        filters=FiltersV0(root=filters),
+        apply_filters=bool(filters),
+        order_by=[Greeting.greeting_id.name],
+        limit=limit,
+        response_as_pydantic=True,
+    )
+    return response.data.main
+
+
+async def get_latest_greeting_id() -> int:
+    """
+    highest greeting_id so far, 0 for an empty table.
+    """
+    response = await run_in_upstream_thread_pool(
+        global_object_square_database_helper.get_rows_v0,
+        database_name=global_string_database_name,
+        schema_name=global_string_schema_name,
+        table_name=Greeting.__tablename__,
+        filters=FiltersV0(root={}),
+        apply_filters=False,
+        columns=[Greeting.greeting_id.name],
+        order_by=[f"-{Greeting.greeting_id.name}"],
+        limit=1,
+        response_as_pydantic=True,
+    )
+    if not response.data.main:
+        return 0
+    return response.data.main[0][Greeting.greeting_id.name]
+
+
+async def add_user_usernames(greetings: List[Dict]) -> List[Dict]:
+    user_map = await get_user_username_map(
+        x[Greeting.user_id.name]
+        for x in greetings
+        if x[Greeting.user_id.name] is not None
+    )
+    return [
+        {
+            **greeting,
+            User.user_username.name: user_map.get(greeting[Greeting.user_id.name]),
+        }
+        for greeting in greetings
+    ]
+
+
+async def iterate_greeting_pages(page_size: int) -> AsyncIterator[List[Dict]]:
+    """
+    walk the whole greeting table in greeting_id order (keyset),
+    yielding pages joined with user_username.
+    """
+    after_greeting_id = None
+    while True:
+        greetings = await get_greetings_after(after_greeting_id, page_size)
+        if not greetings:
+            return
+        yield await add_user_usernames(greetings)
+        if len(greetings) < page_size:
+            return
+        after_greeting_id = greetings[-1][Greeting.greeting_id.name]
+
+
+async def count_greetings(filters: Dict[str, FilterConditionsV0]) -> int:
+    response = await run_in_upstream_thread_pool(
+        global_object_square_database_helper.get_rows_v0,
+        database_name=global_string_database_name,
+        schema_name=global_string_schema_name,
+        table_name=Greeting.__tablename__,
+        filters=FiltersV0(root=filters),
+        apply_filters=bool(filters),
+        columns=[Greeting.greeting_id.name],
+        limit=0,
+        response_as_pydantic=True,
+    )
+    return response.data.total_count
+
+
+async def count_greetings_in_range(
+    filters: Dict[str, FilterConditionsV0],
+    datetime_from: Optional[datetime],
+    datetime_to: Optional[datetime],
+) -> int:
+    """
+    square_database accepts one condition per column,
+    so a closed range is counted as count(< to) - count(< from).
+    """
+    if datetime_from is not None and datetime_to is not None:
+        count_before_to, count_before_from = await asyncio.gather(
+            count_greetings(
+                {
+                    **filters,
+                    Greeting.greeting_datetime.name: FilterConditionsV0(
+                        lt=datetime_to.isoformat()
+                    ),
+                }
+            ),
+            count_greetings(
+                {
+                    **filters,
+                    Greeting.greeting_datetime.name: FilterConditionsV0(
+                        lt=datetime_from.isoformat()
+                    ),
+                }
+            ),
+        )
+        return count_before_to - count_before_from
+    range_filters = dict(filters)
+    if datetime_from is not None:
+        range_filters[Greeting.greeting_datetime.name] = FilterConditionsV0(
+            gte=datetime_from.isoformat()
+        )
+    elif datetime_to is not None:
+        range_filters[Greeting.greeting_datetime.name] = FilterConditionsV0(
+            lt=datetime_to.isoformat()
+        )
+    return await count_greetings(range_filters)
+
+
+def _get_greetings_count_cache_key(
+    filters: Dict[str, FilterConditionsV0],
+    datetime_from: Optional[datetime],
+    datetime_to: Optional[datetime],
+) -> str:
+    return json.dumps(
+        [
+            FiltersV0(root=filters).model_dump(mode="json"),
+            datetime_from.isoformat() if datetime_from else None,
+            datetime_to.isoformat() if datetime_to else None,
+        ],
+        sort_keys=True,
+    )
+
+
+def set_approximate_greetings_count(
+    filters: Dict[str, FilterConditionsV0],
+    datetime_from: Optional[datetime],
+    datetime_to: Optional[datetime],
+    count: int,
+    greetings_generation: int,
+) -> None:
+    """
+    skipped when the greetings changed since greetings_generation was read.
+    """
+    if greetings_generation != _greetings_generation:
+        return
+    global_object_greetings_count_cache.set(
+        _get_greetings_count_cache_key(filters, datetime_from, datetime_to),
+        (time.monotonic(), count),
+    )
+
+
+async def _refresh_greetings_count(
+    filters: Dict[str, FilterConditionsV0],
+    datetime_from: Optional[datetime],
+    datetime_to: Optional[datetime],
+    greetings_generation: int,
+) -> int:
+    try:
+        count = await count_greetings_in_range(filters, datetime_from, datetime_to)
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        raise
+    set_approximate_greetings_count(
+        filters, datetime_from, datetime_to, count, greetings_generation
+    )
+    return count
+
+
+async def get_approximate_greetings_count(
+    filters: Dict[str, FilterConditionsV0],
+    datetime_from: Optional[datetime],
+    datetime_to: Optional[datetime],
+) -> int:
+    """
+    last known count, refreshed in the background once it is older than
+    GREETINGS_COUNT_REFRESH_INTERVAL, only counted inline when unknown or expired.
+    """
+    cache_key = _get_greetings_count_cache_key(filters, datetime_from, datetime_to)
+    greetings_generation = _greetings_generation
+    single_flight_key = (greetings_generation, cache_key)
+    refresh = functools.partial(
+        _refresh_greetings_count,
+        filters,
+        datetime_from,
+        datetime_to,
+        greetings_generation,
+    )
+    cached_count = global_object_greetings_count_cache.get(cache_key)
+    if cached_count is None:
+        return await global_object_greetings_count_single_flight.do(
+            single_flight_key, refresh
+        )
+    counted_at, count = cached_count
+    if time.monotonic() - counted_at > config_float_greetings_count_refresh_interval:
+        global_object_greetings_count_single_flight.start(single_flight_key, refresh)
+    return count
+
+
+class IncrementalGreetingView(ABC):
+    """
+    in-memory view over the greeting table maintained incrementally: each refresh
+    only reads rows above the greeting_id high-water mark. deletions are not
+    visible that way, so the view is rebuilt from scratch after
+    `rebuild_interval` or on the next refresh after reset().
+    a rebuild fills a fresh state in the background and swaps it in with one
+    assignment, readers keep the current state until then.
+    """
+
+    def __init__(
+        self, refresh_interval: float, rebuild_interval: float, page_size: int
+    ):
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.page_size = page_size
+        self.last_greeting_id = 0
+        self.refreshed_at: Optional[float] = None
+        self.built_at: Optional[float] = None
+        # bumped by reset() so a rebuild that started before it is not trusted.
+        self._generation = 0
+        # serializes incremental reads and the swap of a rebuilt state.
+        self._lock = asyncio.Lock()
+        self._rebuild_single_flight = SingleFlight()
+        self.state = self._create_state()
+        global_list_incremental_greeting_views.append(self)
+
+    @abstractmethod
+    def _create_state(self) -> Any:
+        """
+        empty state, filled by _add().
+        """
+
+    @abstractmethod
+    def _add(self, state: Any, greeting: Dict) -> None:
+        pass
+
+    def reset(self) -> None:
+        """
+        to be called whenever greetings are removed.
+        """
+        self.built_at = None
+        self._generation += 1
+
+    async def _read_greetings_after(self, state: Any, last_greeting_id: int) -> int:
+        """
+        add every greeting above last_greeting_id to state,
+        returns the new high-water mark.
+        """
+        while True:
+            greetings = await get_greetings_after(last_greeting_id, self.page_size)
+            for greeting in greetings:
+                self._add(state, greeting)
+            if greetings:
+                last_greeting_id = greetings[-1][Greeting.greeting_id.name]
+            if len(greetings) < self.page_size:
+                return last_greeting_id
+
+    async def _rebuild(self) -> None:
+        generation = self._generation
+        started_at = time.monotonic()
+        try:
+            state = self._create_state()
+            last_greeting_id = await self._read_greetings_after(state, 0)
+        except Exception as e:
+            global_object_square_logger.logger.error(e, exc_info=True)
+            raise
+        async with self._lock:
+            self.state, self.last_greeting_id = state, last_greeting_id
+            self.refreshed_at = time.monotonic()
+            if generation == self._generation:
+                self.built_at = started_at
+
+    async def refresh(self) -> None:
+        """
+        read greetings above the high-water mark, at most once per refresh_interval.
+        only the first build is awaited, later rebuilds run in the background.
+        """
+        if self.refreshed_at is None:
+            await self._rebuild_single_flight.do(None, self._rebuild)
+            return
+        if (
+            self.built_at is None
+            or time.monotonic() - self.built_at > self.rebuild_interval
+        ):
+            self._rebuild_single_flight.start(None, self._rebuild)
+        if time.monotonic() - self.refreshed_at < self.refresh_interval:
+            return
+        async with self._lock:
+            # another caller may have refreshed while this one waited.
+            if time.monotonic() - self.refreshed_at < self.refresh_interval:
+                return
+            self.last_greeting_id = await self._read_greetings_after(
+                self.state, self.last_greeting_id
+            )
+            self.refreshed_at = time.monotonic()
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Optional, Set, Tuple
+
+from square_database_structure.square.greeting.tables import Greeting
+
+from square_administration.configuration import (
+    config_float_greeting_feed_poll_interval,
+    config_int_greeting_feed_queue_size,
+    config_int_greeting_max_page_size,
+    global_object_square_logger,
+)
+from square_administration.pydantic_models.core import GetAllGreetingsV0ResponseMain
+from square_administration.utils.greeting import (
+    add_user_usernames,
+    get_greetings_after,
+    get_latest_greeting_id,
+)
+
+
+class GreetingFeed:
+    """
+    one background poller reads greetings newer than the last seen greeting_id
+    and fans them out to every subscriber, so upstream load does not grow with
+    the number of open feeds. the poller only runs while someone is subscribed.
+    """
+
+    def __init__(self, poll_interval: float, page_size: int, queue_size: int):
+        self.poll_interval = poll_interval
+        self.page_size = page_size
+        self.queue_size = queue_size
+        self.poll_count = 0
+        self.last_greeting_id: Optional[int] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._poller: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        the queue receives (greeting_id, serialized greeting) tuples,
+        None means the subscription was closed by the feed.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._poller is None:
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+            # the next subscriber starts from the latest greeting again.
+            self.last_greeting_id = None
+
+    async def close(self) -> None:
+        poller = self._poller
+        self._poller = None
+        for queue in list(self._subscribers):
+            self._close_subscriber(queue)
+        if poller is not None:
+            poller.cancel()
+            try:
+                await poller
+            except asyncio.CancelledError:
+                pass
+
+    def _close_subscriber(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _publish(self, item: Tuple[int, str]) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # slow consumer, close it instead of buffering without bound.
+                self._close_subscriber(queue)
+
+    async def _poll_once(self) -> None:
+        if self.last_greeting_id is None:
+            self.poll_count += 1
+            self.last_greeting_id = await get_latest_greeting_id()
+            return
+        while True:
+            self.poll_count += 1
+            greetings = await get_greetings_after(self.last_greeting_id, self.page_size)
+            if not greetings:
+                return
+            for greeting in await add_user_usernames(greetings):
+                self._publish(
+                    (
+                        greeting[Greeting.greeting_id.name],
+                        GetAllGreetingsV0ResponseMain.model_validate(
+                            greeting
+                        ).model_dump_json(),
+                    )
+                )
+            self.last_greeting_id = greetings[-1][Greeting.greeting_id.name]
+            if len(greetings) < self.page_size:
+                return
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await self._poll_once()
+            except Exception as e:
+                global_object_square_logger.logger.error(e, exc_info=True)
+            await asyncio.sleep(self.poll_interval)
+
+
+global_object_greeting_feed = GreetingFeed(
+    poll_interval=config_float_greeting_feed_poll_interval,
+    page_size=config_int_greeting_max_page_size,
+    queue_size=config_int_greeting_feed_queue_size,
+)
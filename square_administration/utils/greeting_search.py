@@ -0,0 +1,103 @@
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from square_database_structure.square.greeting.tables import Greeting
+
+from square_administration.configuration import (
+    config_float_greeting_search_rebuild_interval,
+    config_float_greeting_search_refresh_interval,
+    config_int_greeting_export_page_size,
+)
+from square_administration.utils.greeting import IncrementalGreetingView
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def get_search_terms(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+@dataclass
+class GreetingSearchState:
+    # term -> greeting_id -> term frequency.
+    postings: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    greetings: Dict[int, Dict] = field(default_factory=dict)
+
+
+class GreetingSearchIndex(IncrementalGreetingView):
+    """
+    inverted index over greeting_text and greeting_anonymous_sender_name.
+    """
+
+    def _create_state(self) -> GreetingSearchState:
+        return GreetingSearchState()
+
+    def _add(self, state: GreetingSearchState, greeting: Dict) -> None:
+        greeting_id = greeting[Greeting.greeting_id.name]
+        state.greetings[greeting_id] = greeting
+        terms = Counter(
+            get_search_terms(greeting[Greeting.greeting_text.name])
+            + get_search_terms(greeting[Greeting.greeting_anonymous_sender_name.name])
+        )
+        for term, term_frequency in terms.items():
+            state.postings.setdefault(term, {})[greeting_id] = term_frequency
+
+    def search(
+        self, terms: List[str], limit: int, offset: int
+    ) -> Tuple[int, List[Tuple[Dict, float]]]:
+        """
+        greetings containing every term, ranked by tf-idf then newest first.
+        returns (total hit count, [(greeting, score)] for the requested page).
+        """
+        state = self.state
+        term_postings = [state.postings.get(term) for term in set(terms)]
+        if not term_postings or any(x is None for x in term_postings):
+            return 0, []
+        term_postings.sort(key=len)
+        greeting_ids = set(term_postings[0])
+        for postings in term_postings[1:]:
+            greeting_ids.intersection_update(postings)
+        greeting_count = len(state.greetings)
+        idfs = [math.log(1 + greeting_count / len(x)) for x in term_postings]
+        scored_greeting_ids = (
+            (
+                sum(
+                    postings[greeting_id] * idf
+                    for postings, idf in zip(term_postings, idfs)
+                ),
+                greeting_id,
+            )
+            for greeting_id in greeting_ids
+        )
+        page = heapq.nlargest(offset + limit, scored_greeting_ids)[offset:]
+        return len(greeting_ids), [
+            (state.greetings[greeting_id], score) for score, greeting_id in page
+        ]
+
+    def start_refresh(self) -> asyncio.Task:
+        """
+        refresh in the background, e.g. to build the index while the app starts.
+        """
+        task = asyncio.get_running_loop().create_task(self.refresh())
+        task.add_done_callback(self._retrieve_refresh_error)
+        return task
+
+    @staticmethod
+    def _retrieve_refresh_error(task: asyncio.Task) -> None:
+        # a failed build is logged by _rebuild() and retried on the next refresh.
+        if not task.cancelled():
+            task.exception()
+
+
+global_object_greeting_search_index = GreetingSearchIndex(
+    refresh_interval=config_float_greeting_search_refresh_interval,
+    rebuild_interval=config_float_greeting_search_rebuild_interval,
+    page_size=config_int_greeting_export_page_size,
+)
@@ -0,0 +1,79 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from square_database_structure.square.greeting.tables import Greeting
+
+from square_administration.configuration import (
+    config_float_greeting_stats_rebuild_interval,
+    config_float_greeting_stats_refresh_interval,
+    config_int_greeting_export_page_size,
+)
+from square_administration.utils.greeting import IncrementalGreetingView
+
+
+@dataclass
+class GreetingStatsState:
+    total_count: int = 0
+    anonymous_count: int = 0
+    per_day: Counter = field(default_factory=Counter)
+    per_week: Counter = field(default_factory=Counter)
+    per_user: Counter = field(default_factory=Counter)
+
+
+@dataclass(frozen=True)
+class GreetingStatsSnapshot:
+    """
+    copy of the counters, safe to read across awaits.
+    """
+
+    total_count: int
+    anonymous_count: int
+    per_day: Dict[str, int]
+    per_week: Dict[str, int]
+    top_senders: List[Tuple[str, int]]
+    last_greeting_id: int
+
+
+class GreetingStats(IncrementalGreetingView):
+    """
+    greeting counters per day, week, sender and anonymity.
+    """
+
+    def _create_state(self) -> GreetingStatsState:
+        return GreetingStatsState()
+
+    def _add(self, state: GreetingStatsState, greeting: Dict) -> None:
+        greeting_datetime = datetime.fromisoformat(
+            greeting[Greeting.greeting_datetime.name]
+        ).astimezone(timezone.utc)
+        iso_year, iso_week, _ = greeting_datetime.isocalendar()
+        state.total_count += 1
+        if greeting[Greeting.greeting_is_anonymous.name]:
+            state.anonymous_count += 1
+        state.per_day[greeting_datetime.date().isoformat()] += 1
+        state.per_week[f"{iso_year}-W{iso_week:02d}"] += 1
+        if greeting[Greeting.user_id.name] is not None:
+            state.per_user[greeting[Greeting.user_id.name]] += 1
+
+    def get_snapshot(self, top_senders_limit: int) -> GreetingStatsSnapshot:
+        """
+        to be taken right after refresh(), before the next await.
+        """
+        state = self.state
+        return GreetingStatsSnapshot(
+            total_count=state.total_count,
+            anonymous_count=state.anonymous_count,
+            per_day=dict(state.per_day),
+            per_week=dict(state.per_week),
+            top_senders=state.per_user.most_common(top_senders_limit),
+            last_greeting_id=self.last_greeting_id,
+        )
+
+
+global_object_greeting_stats = GreetingStats(
+    refresh_interval=config_float_greeting_stats_refresh_interval,
+    rebuild_interval=config_float_greeting_stats_rebuild_interval,
+    page_size=config_int_greeting_export_page_size,
+)
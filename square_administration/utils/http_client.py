@@ -0,0 +1,178 @@
+import asyncio
+import importlib.util
+from typing import Any, Optional
+
+import httpx
+from requests import HTTPError
+from square_authentication_helper import SquareAuthenticationHelper
+from square_commons.api_utils import make_request
+from square_database_helper import SquareDatabaseHelper
+
+global_object_http_client: Optional[httpx.AsyncClient] = None
+global_object_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def open_http_client(
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    timeout: float,
+    http2: bool,
+) -> httpx.AsyncClient:
+    """
+    create the process wide pooled client, to be called from the app lifespan.
+    """
+    global global_object_http_client, global_object_http_client_loop
+
+    if http2 and importlib.util.find_spec("h2") is None:
+        # httpx needs the optional h2 package for http/2.
+        http2 = False
+    global_object_http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=timeout,
+        http2=http2,
+    )
+    global_object_http_client_loop = asyncio.get_running_loop()
+    return global_object_http_client
+
+
+async def close_http_client() -> None:
+    global global_object_http_client, global_object_http_client_loop
+
+    if global_object_http_client is not None:
+        await global_object_http_client.aclose()
+    global_object_http_client = None
+    global_object_http_client_loop = None
+
+
+async def make_async_request(
+    method: str,
+    url: str,
+    *,
+    endpoint: Optional[str] = None,
+    json: Optional[Any] = None,
+    data: Optional[Any] = None,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    files: Optional[Any] = None,
+) -> Any:
+    """
+    async counterpart of square_commons make_request(return_type="json")
+    that goes through the shared pooled client.
+    """
+    if headers:
+        headers = {key.replace("_", "-"): value for key, value in headers.items()}
+    if endpoint:
+        url = f"{url.rstrip('/')}/{endpoint.lstrip('/')}"
+    response = await global_object_http_client.request(
+        method,
+        url,
+        json=json,
+        data=data,
+        params=params,
+        headers=headers,
+        files=files,
+    )
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as http_status_error:
+        # utils handle upstream errors as requests.HTTPError,
+        # httpx.Response exposes the same status_code and content attributes.
+        raise HTTPError(str(http_status_error), response=response)
+    return response.json()
+
+
+def make_request_through_shared_client(
+    method: str,
+    url: str,
+    *,
+    endpoint: Optional[str] = None,
+    json: Optional[Any] = None,
+    data: Optional[Any] = None,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    files: Optional[Any] = None,
+) -> Any:
+    """
+    blocking entry point used by the helpers from worker threads.
+    the request itself runs on the event loop through the shared client,
+    falls back to a plain request when the client is not open
+    (outside the app lifespan) or when called from the event loop thread.
+    """
+    loop = global_object_http_client_loop
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if (
+        global_object_http_client is None
+        or loop is None
+        or loop.is_closed()
+        or running_loop is loop
+    ):
+        return make_request(
+            method=method,
+            url=url,
+            endpoint=endpoint,
+            json=json,
+            data=data,
+            params=params,
+            headers=headers,
+            files=files,
+            return_type="json",
+        )
+    return asyncio.run_coroutine_threadsafe(
+        make_async_request(
+            method,
+            url,
+            endpoint=endpoint,
+            json=json,
+            data=data,
+            params=params,
+            headers=headers,
+            files=files,
+        ),
+        loop,
+    ).result()
+
+
+class PooledSquareDatabaseHelper(SquareDatabaseHelper):
+    def _make_request(
+        self, method, endpoint, json=None, data=None, params=None, headers=None
+    ):
+        return make_request_through_shared_client(
+            method,
+            self.global_str_square_database_url_base,
+            endpoint=endpoint,
+            json=json,
+            data=data,
+            params=params,
+            headers=headers,
+        )
+
+
+class PooledSquareAuthenticationHelper(SquareAuthenticationHelper):
+    def _make_request(
+        self,
+        method,
+        endpoint,
+        json=None,
+        data=None,
+        params=None,
+        headers=None,
+        files=None,
+    ):
+        return make_request_through_shared_client(
+            method,
+            self.global_str_square_authentication_url_base,
+            endpoint=endpoint,
+            json=json,
+            data=data,
+            params=params,
+            headers=headers,
+            files=files,
+        )
@@ -0,0 +1,87 @@
+import base64
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+
+class KeysetCursor(BaseModel):
+    # sort value and id of the last row that was returned.
+    value: Any
+    id: int
+    # rows sharing `value` that were already returned,
+    # square_database applies a single condition per column so the tie break
+    # on id is expressed as an offset inside the rows equal to `value`.
+    skip: int
+    descending: bool
+
+
+def get_keyset_direction(
+    order_by: List[str], sort_column: str, id_column: str
+) -> Optional[bool]:
+    """
+    returns True / False for descending / ascending keyset ordering on
+    (sort_column, id_column), None if order_by can not be paginated by keyset.
+    """
+    if not order_by or len(order_by) > 2:
+        return None
+    descending = order_by[0].startswith("-")
+    if order_by[0].lstrip("-") != sort_column:
+        return None
+    if len(order_by) == 2 and order_by[1] != ("-" if descending else "") + id_column:
+        return None
+    return descending
+
+
+def get_keyset_order_by(
+    sort_column: str, id_column: str, descending: bool
+) -> List[str]:
+    prefix = "-" if descending else ""
+    return [prefix + sort_column, prefix + id_column]
+
+
+def encode_keyset_cursor(cursor: KeysetCursor) -> str:
+    return base64.urlsafe_b64encode(cursor.model_dump_json().encode("utf-8")).decode(
+        "ascii"
+    )
+
+
+def decode_keyset_cursor(cursor: str) -> KeysetCursor:
+    """
+    raises ValueError for malformed cursors.
+    """
+    try:
+        return KeysetCursor.model_validate_json(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+    except (ValidationError, ValueError) as error:
+        raise ValueError(f"invalid cursor: {cursor}.") from error
+
+
+def get_next_keyset_cursor(
+    rows: List[Dict[str, Any]],
+    sort_column: str,
+    id_column: str,
+    descending: bool,
+    previous_cursor: Optional[KeysetCursor],
+    offset: int,
+) -> Optional[KeysetCursor]:
+    """
+    build the cursor pointing after the last row of a page.
+    returns None when the tie offset can not be derived from this page alone
+    (offset paging where every row of the page shares the same sort value).
+    """
+    if not rows:
+        return None
+    last_value = rows[-1][sort_column]
+    skip = sum(1 for row in rows if row[sort_column] == last_value)
+    if skip == len(rows):
+        if previous_cursor is not None and previous_cursor.value == last_value:
+            skip += previous_cursor.skip
+        elif previous_cursor is None and offset > 0:
+            return None
+    return KeysetCursor(
+        value=last_value,
+        id=rows[-1][id_column],
+        skip=skip,
+        descending=descending,
+    )
@@ -0,0 +1,38 @@
+import bcrypt
+from fastapi import HTTPException, status
+from square_commons import get_api_output_in_standard_format
+
+from square_administration.configuration import (
+    config_int_password_check_pool_size,
+    config_int_password_check_queue_size,
+)
+from square_administration.messages import messages
+from square_administration.utils.concurrency import BoundedThreadPool, PoolFullError
+
+# bcrypt releases the gil, so threads give real parallelism for hash checks.
+global_object_password_check_pool = BoundedThreadPool(
+    size=config_int_password_check_pool_size,
+    queue_size=config_int_password_check_queue_size,
+)
+
+
+async def check_password(password: str, hashed_password: str) -> bool:
+    """
+    bcrypt.checkpw off the event loop,
+    raises HTTPException 503 when too many checks are already queued.
+    """
+    try:
+        return await global_object_password_check_pool.run(
+            bcrypt.checkpw,
+            password.encode("utf-8"),
+            hashed_password.encode("utf-8"),
+        )
+    except PoolFullError as pool_full_error:
+        output_content = get_api_output_in_standard_format(
+            message=messages["SERVER_BUSY"],
+            log=f"password check rejected: {pool_full_error}",
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=output_content,
+        )
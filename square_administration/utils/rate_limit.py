@@ -0,0 +1,96 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from square_commons import get_api_output_in_standard_format
+
+from square_administration.configuration import (
+    config_float_rate_limit_ip_refill_rate,
+    config_float_rate_limit_username_refill_rate,
+    config_int_rate_limit_ip_capacity,
+    config_int_rate_limit_max_keys,
+    config_int_rate_limit_username_capacity,
+)
+from square_administration.messages import messages
+
+
+class TokenBucketRateLimiter:
+    """
+    one token bucket per key: bursts of up to `capacity` requests,
+    refilled at `refill_rate` tokens per second.
+    buckets are kept in lru order and the least recently used ones are evicted
+    beyond `max_keys`, an evicted key simply starts again with a full bucket.
+    """
+
+    def __init__(self, capacity: int, refill_rate: float, max_keys: int):
+        if capacity < 1 or refill_rate <= 0:
+            raise ValueError(
+                f"Invalid rate limit capacity: {capacity} or refill_rate: {refill_rate}"
+            )
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_keys = max_keys
+        self.rejected_count = 0
+        self._buckets: OrderedDict[Hashable, Tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> float:
+        """
+        take one token for `key`.
+        returns 0 when allowed, otherwise the seconds until a token is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                self.rejected_count += 1
+                retry_after = (1 - tokens) / self.refill_rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+
+global_object_ip_rate_limiter = TokenBucketRateLimiter(
+    capacity=config_int_rate_limit_ip_capacity,
+    refill_rate=config_float_rate_limit_ip_refill_rate,
+    max_keys=config_int_rate_limit_max_keys,
+)
+global_object_username_rate_limiter = TokenBucketRateLimiter(
+    capacity=config_int_rate_limit_username_capacity,
+    refill_rate=config_float_rate_limit_username_refill_rate,
+    max_keys=config_int_rate_limit_max_keys,
+)
+
+
+def get_rate_limit_response(
+    request: Request, username: Optional[str] = None
+) -> Optional[JSONResponse]:
+    """
+    429 response when the client ip or the username is over its limit, None otherwise.
+    to be checked before any upstream call or password hash check.
+    """
+    client_host = request.client.host if request.client else None
+    retry_after = global_object_ip_rate_limiter.acquire(client_host)
+    if not retry_after and username is not None:
+        retry_after = global_object_username_rate_limiter.acquire(username.lower())
+    if not retry_after:
+        return None
+    output_content = get_api_output_in_standard_format(
+        message=messages["TOO_MANY_REQUESTS"],
+        log=f"rate limit exceeded for {client_host} / {username}.",
+    )
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content=output_content,
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
@@ -1,15 +1,12 @@
 import json
-from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Optional
 
-import bcrypt
 import jwt
 from fastapi import Header, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from requests import HTTPError
-from square_authentication_helper import TokenType
 from square_commons import get_api_output_in_standard_format
-from square_commons.api_utils import StandardResponse, create_cookie
+from square_commons.api_utils import StandardResponse
 from square_database_helper.pydantic_models import FilterConditionsV0, FiltersV0
 from square_database_structure.square import global_string_database_name
 from square_database_structure.square.authentication import global_string_schema_name
@@ -17,11 +14,9 @@ from square_database_structure.square.authentication.tables import User, UserCre
 
 from square_administration.configuration import (
     config_str_admin_password_hash,
-    config_str_cookie_domain,
     global_object_square_authentication_helper,
     global_object_square_database_helper,
     global_object_square_logger,
-    config_list_admin_allowed_emails,
 )
 from square_administration.messages import messages
 from square_administration.pydantic_models.authentication import (
@@ -42,11 +37,61 @@ from square_administration.pydantic_models.authentication import (
     RegisterLoginGoogleV0,
     RegisterLoginGoogleV0Response,
 )
-from square_administration.utils.common import global_int_app_id, is_https
+from square_administration.utils.common import (
+    create_refresh_token_cookie,
+    get_app_id,
+)
+from square_administration.utils.concurrency import run_in_upstream_thread_pool
+from square_administration.utils.google_id_token import (
+    is_google_id_token_verification_enabled,
+    verify_google_id_token,
+)
+from square_administration.utils.password import check_password
+from square_administration.utils.rate_limit import get_rate_limit_response
+from square_administration.utils.token import (
+    generate_access_token,
+    get_access_token_payload,
+    get_refresh_token_payload,
+    invalidate_all_refresh_tokens,
+    invalidate_refresh_token,
+)
+from square_administration.utils.serialization import ResponseSerializer
+from square_administration.utils.settings import get_settings
+from square_administration.utils.user import invalidate_user_username
+
+# response types are parametrized and compiled once instead of per request.
+global_object_register_username_v0_response_serializer = ResponseSerializer(
+    StandardResponse[RegisterUsernameV0Response]
+)
+global_object_login_username_v0_response_serializer = ResponseSerializer(
+    StandardResponse[LoginUsernameV0Response]
+)
+global_object_remove_app_for_self_v0_response_serializer = ResponseSerializer(
+    StandardResponse[RemoveAppForSelfV0Response]
+)
+global_object_logout_v0_response_serializer = ResponseSerializer(LogoutV0Response)
+global_object_generate_access_token_v0_response_serializer = ResponseSerializer(
+    StandardResponse[GenerateAccessTokenV0Response]
+)
+global_object_reset_password_and_login_using_backup_code_v0_response_serializer = (
+    ResponseSerializer(StandardResponse[ResetPasswordAndLoginUsingBackupCodeV0Response])
+)
+global_object_reset_password_and_login_using_reset_email_code_v0_response_serializer = (
+    ResponseSerializer(
+        StandardResponse[ResetPasswordAndLoginUsingResetEmailCodeV0Response]
+    )
+)
+global_object_update_password_v0_response_serializer = ResponseSerializer(
+    UpdatePasswordV0Response
+)
+global_object_register_login_google_v0_response_serializer = ResponseSerializer(
+    StandardResponse[RegisterLoginGoogleV0Response]
+)
 
 
 @global_object_square_logger.auto_logger()
-def util_register_username_v0(
+async def util_register_username_v0(
+    request: Request,
     body: RegisterUsernameV0,
 ):
     username = body.username
@@ -58,14 +103,12 @@ def util_register_username_v0(
         """
         validation
         """
+        rate_limit_response = get_rate_limit_response(request, username)
+        if rate_limit_response is not None:
+            return rate_limit_response
 
         # validation for admin_password
-        if not (
-            bcrypt.checkpw(
-                admin_password.encode("utf-8"),
-                config_str_admin_password_hash.encode("utf-8"),
-            )
-        ):
+        if not await check_password(admin_password, config_str_admin_password_hash):
             output_content = get_api_output_in_standard_format(
                 message=messages["INCORRECT_PASSWORD"],
                 log=f"incorrect admin password.",
@@ -78,39 +121,31 @@ def util_register_username_v0(
         """
         main process
         """
-        response = global_object_square_authentication_helper.register_username_v0(
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.register_username_v0,
             username=username,
             password=password,
-            app_id=global_int_app_id,
-            response_as_pydantic=True,
+            app_id=get_app_id(),
         )
         """
         return value
         """
-        refresh_token = response.data.main.refresh_token
-        refresh_token_expiry_time = response.data.main.refresh_token_expiry_time
-        modified_response = response.model_dump()
-        del modified_response["data"]["main"]["refresh_token"]
-        del modified_response["data"]["main"]["refresh_token_expiry_time"]
-
-        output_content = get_api_output_in_standard_format(
-            message=messages["REGISTRATION_SUCCESSFUL"],
-            data=RegisterUsernameV0Response(**modified_response["data"]).model_dump(),
-            as_dict=False,
+        refresh_token = response["data"]["main"].pop("refresh_token")
+        refresh_token_expiry_time = response["data"]["main"].pop(
+            "refresh_token_expiry_time"
         )
-        json_response = JSONResponse(
-            status_code=status.HTTP_201_CREATED,
-            content=output_content.model_dump(),
+
+        output_content = {
+            "data": response["data"],
+            "message": messages["REGISTRATION_SUCCESSFUL"],
+        }
+        json_response = (
+            global_object_register_username_v0_response_serializer.get_response(
+                output_content, status_code=status.HTTP_201_CREATED
+            )
         )
         json_response.set_cookie(
-            **create_cookie(
-                key="refresh_token|" + str(global_int_app_id),
-                value=refresh_token,
-                domain=config_str_cookie_domain,
-                expires=datetime.fromisoformat(refresh_token_expiry_time),
-                secure=is_https(),
-                http_only=True,
-            )
+            **create_refresh_token_cookie(refresh_token, refresh_token_expiry_time)
         )
         return json_response
     except HTTPError as http_error:
@@ -148,7 +183,8 @@ def util_register_username_v0(
 
 
 @global_object_square_logger.auto_logger()
-def util_login_username_v0(
+async def util_login_username_v0(
+    request: Request,
     body: LoginUsernameV0,
 ):
     username = body.username
@@ -158,44 +194,38 @@ def util_login_username_v0(
         """
         validation
         """
-        # pass
+        rate_limit_response = get_rate_limit_response(request, username)
+        if rate_limit_response is not None:
+            return rate_limit_response
         """
         main process
         """
-        response = global_object_square_authentication_helper.login_username_v0(
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.login_username_v0,
             username=username,
             password=password,
-            app_id=global_int_app_id,
+            app_id=get_app_id(),
             assign_app_id_if_missing=False,
-            response_as_pydantic=True,
         )
         """
         return value
         """
-        refresh_token = response.data.main.refresh_token
-        refresh_token_expiry_time = response.data.main.refresh_token_expiry_time
-        modified_response = response.model_dump()
-        del modified_response["data"]["main"]["refresh_token"]
-        del modified_response["data"]["main"]["refresh_token_expiry_time"]
-
-        output_content = get_api_output_in_standard_format(
-            message=messages["LOGIN_SUCCESSFUL"],
-            data=LoginUsernameV0Response(**modified_response["data"]).model_dump(),
-            as_dict=False,
+        refresh_token = response["data"]["main"].pop("refresh_token")
+        refresh_token_expiry_time = response["data"]["main"].pop(
+            "refresh_token_expiry_time"
         )
-        json_response = JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+
+        output_content = {
+            "data": response["data"],
+            "message": messages["LOGIN_SUCCESSFUL"],
+        }
+        json_response = (
+            global_object_login_username_v0_response_serializer.get_response(
+                output_content
+            )
         )
         json_response.set_cookie(
-            **create_cookie(
-                key="refresh_token|" + str(global_int_app_id),
-                value=refresh_token,
-                domain=config_str_cookie_domain,
-                expires=datetime.fromisoformat(refresh_token_expiry_time),
-                secure=is_https(),
-                http_only=True,
-            )
+            **create_refresh_token_cookie(refresh_token, refresh_token_expiry_time)
         )
         return json_response
     except HTTPError as http_error:
@@ -233,7 +263,7 @@ def util_login_username_v0(
 
 
 @global_object_square_logger.auto_logger()
-def util_remove_app_for_self_v0(
+async def util_remove_app_for_self_v0(
     access_token: Annotated[str, Header()],
     body: RemoveAppForSelfV0,
 ):
@@ -242,14 +272,10 @@ def util_remove_app_for_self_v0(
         """
         validation
         """
-        access_token_payload = global_object_square_authentication_helper.validate_and_get_payload_from_token_v0(
-            access_token,
-            TokenType.access_token,
-            app_id=global_int_app_id,
-            response_as_pydantic=True,
-        )
-        user_id = access_token_payload.data.main["user_id"]
-        user_credentials_response = global_object_square_database_helper.get_rows_v0(
+        access_token_payload = await get_access_token_payload(access_token)
+        user_id = access_token_payload["user_id"]
+        user_credentials_response = await run_in_upstream_thread_pool(
+            global_object_square_database_helper.get_rows_v0,
             database_name=global_string_database_name,
             schema_name=global_string_schema_name,
             table_name=UserCredential.__tablename__,
@@ -265,12 +291,7 @@ def util_remove_app_for_self_v0(
             UserCredential.user_credential_hashed_password.name
         ]
 
-        if not (
-            bcrypt.checkpw(
-                password.encode("utf-8"),
-                hashed_password.encode("utf-8"),
-            )
-        ):
+        if not await check_password(password, hashed_password):
             output_content = get_api_output_in_standard_format(
                 message=messages["INCORRECT_PASSWORD"],
                 log=f"incorrect password for user_id {user_id}.",
@@ -282,24 +303,22 @@ def util_remove_app_for_self_v0(
         """
         main process
         """
-        response = global_object_square_authentication_helper.update_user_app_ids_v0(
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.update_user_app_ids_v0,
             access_token=access_token,
             app_ids_to_add=[],
-            app_ids_to_remove=[global_int_app_id],
-            response_as_pydantic=True,
+            app_ids_to_remove=[get_app_id()],
         )
+        invalidate_user_username(user_id)
         """
         return value
         """
-        data_to_return = RemoveAppForSelfV0Response(main=response.data.main)
-        output_content = get_api_output_in_standard_format(
-            message=messages["GENERIC_UPDATE_SUCCESSFUL"],
-            data=data_to_return.model_dump(),
-            as_dict=False,
-        )
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+        output_content = {
+            "data": {"main": response["data"]["main"]},
+            "message": messages["GENERIC_UPDATE_SUCCESSFUL"],
+        }
+        return global_object_remove_app_for_self_v0_response_serializer.get_response(
+            output_content
         )
     except HTTPError as http_error:
         global_object_square_logger.logger.error(http_error, exc_info=True)
@@ -336,14 +355,12 @@ def util_remove_app_for_self_v0(
 
 
 @global_object_square_logger.auto_logger()
-def util_logout_v0(request: Request):
+async def util_logout_v0(refresh_token: Optional[str]):
 
     try:
         """
         validation
         """
-
-        refresh_token = request.cookies.get("refresh_token|" + str(global_int_app_id))
         if refresh_token is None:
             output_content = get_api_output_in_standard_format(
                 message=messages["REFRESH_TOKEN_NOT_FOUND"],
@@ -353,35 +370,20 @@ def util_logout_v0(request: Request):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content=output_content,
             )
-        refresh_token_payload = global_object_square_authentication_helper.validate_and_get_payload_from_token_v0(
-            refresh_token,
-            TokenType.refresh_token,
-            app_id=global_int_app_id,
-            response_as_pydantic=True,
-        ).data.main
-        if refresh_token_payload["app_id"] != global_int_app_id:
-            output_content = get_api_output_in_standard_format(
-                message=messages["INCORRECT_REFRESH_TOKEN"],
-                log=f"refresh token is for different app id. intended app id: {global_int_app_id}, actual app id: {refresh_token_payload['app_id']}.",
-            )
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content=output_content,
-            )
+        await get_refresh_token_payload(refresh_token)
         """
         main process
         """
-        response = global_object_square_authentication_helper.logout_v0(
-            refresh_token=refresh_token, response_as_pydantic=True
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.logout_v0,
+            refresh_token=refresh_token,
         )
+        # only once revoked upstream, so nothing in flight can cache it again.
+        invalidate_refresh_token(refresh_token)
         """
         return value
         """
-        output_content = LogoutV0Response(**response.model_dump())
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
-        )
+        return global_object_logout_v0_response_serializer.get_response(response)
     except HTTPError as http_error:
         global_object_square_logger.logger.error(http_error, exc_info=True)
         """
@@ -417,15 +419,14 @@ def util_logout_v0(request: Request):
 
 
 @global_object_square_logger.auto_logger()
-def util_generate_access_token_v0(
-    request: Request,
+async def util_generate_access_token_v0(
+    refresh_token: Optional[str],
 ):
 
     try:
         """
         validation
         """
-        refresh_token = request.cookies.get("refresh_token|" + str(global_int_app_id))
         if refresh_token is None:
             output_content = get_api_output_in_standard_format(
                 message=messages["REFRESH_TOKEN_NOT_FOUND"],
@@ -435,36 +436,15 @@ def util_generate_access_token_v0(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content=output_content,
             )
-        refresh_token_payload = global_object_square_authentication_helper.validate_and_get_payload_from_token_v0(
-            refresh_token,
-            TokenType.refresh_token,
-            app_id=global_int_app_id,
-            response_as_pydantic=True,
-        ).data.main
-        if refresh_token_payload["app_id"] != global_int_app_id:
-            output_content = get_api_output_in_standard_format(
-                message=messages["INCORRECT_REFRESH_TOKEN"],
-                log=f"refresh token is for different app id. intended app id: {global_int_app_id}, actual app id: {refresh_token_payload['app_id']}.",
-            )
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content=output_content,
-            )
         """
         main process
         """
-        response = global_object_square_authentication_helper.generate_access_token_v0(
-            refresh_token=refresh_token, response_as_pydantic=True
-        )
+        response = await generate_access_token(refresh_token)
         """
         return value
         """
-        output_content = StandardResponse[GenerateAccessTokenV0Response](
-            **response.model_dump()
-        )
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+        return global_object_generate_access_token_v0_response_serializer.get_response(
+            response
         )
     except HTTPError as http_error:
         global_object_square_logger.logger.error(http_error, exc_info=True)
@@ -501,7 +481,8 @@ def util_generate_access_token_v0(
 
 
 @global_object_square_logger.auto_logger()
-def util_reset_password_and_login_using_backup_code_v0(
+async def util_reset_password_and_login_using_backup_code_v0(
+    request: Request,
     body: ResetPasswordAndLoginUsingBackupCodeV0,
 ):
     backup_code = body.backup_code
@@ -512,44 +493,33 @@ def util_reset_password_and_login_using_backup_code_v0(
         """
         validation
         """
-        # pass
+        rate_limit_response = get_rate_limit_response(request, username)
+        if rate_limit_response is not None:
+            return rate_limit_response
         """
         main process
         """
-        response = global_object_square_authentication_helper.reset_password_and_login_using_backup_code_v0(
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.reset_password_and_login_using_backup_code_v0,
             backup_code=backup_code,
             username=username,
             new_password=new_password,
-            app_id=global_int_app_id,
+            app_id=get_app_id(),
             logout_other_sessions=logout_other_sessions,
-            response_as_pydantic=True,
         )
         """
         return value
         """
-        refresh_token = response.data.main.refresh_token
-        refresh_token_expiry_time = response.data.main.refresh_token_expiry_time
-        modified_response = response.model_dump()
-        del modified_response["data"]["main"]["refresh_token"]
-        del modified_response["data"]["main"]["refresh_token_expiry_time"]
-
-        output_content = StandardResponse[
-            ResetPasswordAndLoginUsingBackupCodeV0Response
-        ](**modified_response)
+        refresh_token = response["data"]["main"].pop("refresh_token")
+        refresh_token_expiry_time = response["data"]["main"].pop(
+            "refresh_token_expiry_time"
+        )
 
-        json_response = JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+        json_response = global_object_reset_password_and_login_using_backup_code_v0_response_serializer.get_response(
+            response
         )
         json_response.set_cookie(
-            **create_cookie(
-                key="refresh_token|" + str(global_int_app_id),
-                value=refresh_token,
-                domain=config_str_cookie_domain,
-                expires=datetime.fromisoformat(refresh_token_expiry_time),
-                secure=is_https(),
-                http_only=True,
-            )
+            **create_refresh_token_cookie(refresh_token, refresh_token_expiry_time)
         )
         return json_response
     except HTTPError as http_error:
@@ -587,7 +557,8 @@ def util_reset_password_and_login_using_backup_code_v0(
 
 
 @global_object_square_logger.auto_logger()
-def util_reset_password_and_login_using_reset_email_code_v0(
+async def util_reset_password_and_login_using_reset_email_code_v0(
+    request: Request,
     body: ResetPasswordAndLoginUsingResetEmailCodeV0,
 ):
     reset_email_code = body.reset_email_code
@@ -598,43 +569,32 @@ def util_reset_password_and_login_using_reset_email_code_v0(
         """
         validation
         """
-        # pass
+        rate_limit_response = get_rate_limit_response(request, username)
+        if rate_limit_response is not None:
+            return rate_limit_response
         """
         main process
         """
-        response = global_object_square_authentication_helper.reset_password_and_login_using_reset_email_code_v0(
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.reset_password_and_login_using_reset_email_code_v0,
             reset_email_code=reset_email_code,
             username=username,
             new_password=new_password,
-            app_id=global_int_app_id,
+            app_id=get_app_id(),
             logout_other_sessions=logout_other_sessions,
-            response_as_pydantic=True,
         )
         """
         return value
         """
-        refresh_token = response.data.main.refresh_token
-        refresh_token_expiry_time = response.data.main.refresh_token_expiry_time
-        modified_response = response.model_dump()
-        del modified_response["data"]["main"]["refresh_token"]
-        del modified_response["data"]["main"]["refresh_token_expiry_time"]
-        output_content = StandardResponse[
-            ResetPasswordAndLoginUsingResetEmailCodeV0Response
-        ](**modified_response)
-
-        json_response = JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+        refresh_token = response["data"]["main"].pop("refresh_token")
+        refresh_token_expiry_time = response["data"]["main"].pop(
+            "refresh_token_expiry_time"
+        )
+        json_response = global_object_reset_password_and_login_using_reset_email_code_v0_response_serializer.get_response(
+            response
         )
         json_response.set_cookie(
-            **create_cookie(
-                key="refresh_token|" + str(global_int_app_id),
-                value=refresh_token,
-                domain=config_str_cookie_domain,
-                expires=datetime.fromisoformat(refresh_token_expiry_time),
-                secure=is_https(),
-                http_only=True,
-            )
+            **create_refresh_token_cookie(refresh_token, refresh_token_expiry_time)
         )
         return json_response
     except HTTPError as http_error:
@@ -672,8 +632,8 @@ def util_reset_password_and_login_using_reset_email_code_v0(
 
 
 @global_object_square_logger.auto_logger()
-def util_update_password_v0(
-    request: Request,
+async def util_update_password_v0(
+    refresh_token: Optional[str],
     body: UpdatePasswordV0,
     access_token: Annotated[str, Header()],
 ):
@@ -684,37 +644,33 @@ def util_update_password_v0(
         """
         validation
         """
-        refresh_token = request.cookies.get("refresh_token|" + str(global_int_app_id))
         preserve_session_refresh_token = refresh_token
-        if refresh_token is None:
-            preserve_session_refresh_token = None
-        else:
-            refresh_token_payload = global_object_square_authentication_helper.validate_and_get_payload_from_token_v0(
-                refresh_token,
-                TokenType.refresh_token,
-                app_id=global_int_app_id,
-                response_as_pydantic=True,
-            ).data.main
-            if refresh_token_payload["app_id"] != global_int_app_id:
+        if refresh_token is not None:
+            try:
+                await get_refresh_token_payload(refresh_token)
+            except HTTPException:
+                # refresh token of a different app.
                 preserve_session_refresh_token = None
         """
         main process
         """
-        response = global_object_square_authentication_helper.update_password_v0(
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.update_password_v0,
             old_password=old_password,
             new_password=new_password,
             access_token=access_token,
             logout_other_sessions=logout_other_sessions,
             preserve_session_refresh_token=preserve_session_refresh_token,
-            response_as_pydantic=True,
         )
+        if logout_other_sessions:
+            invalidate_all_refresh_tokens()
+        elif refresh_token is not None:
+            invalidate_refresh_token(refresh_token)
         """
         return value
         """
-        output_content = UpdatePasswordV0Response(**response.model_dump())
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+        return global_object_update_password_v0_response_serializer.get_response(
+            response
         )
     except HTTPError as http_error:
         global_object_square_logger.logger.error(http_error, exc_info=True)
@@ -751,16 +707,23 @@ def util_update_password_v0(
 
 
 @global_object_square_logger.auto_logger()
-def util_register_login_google_v0(body: RegisterLoginGoogleV0):
+async def util_register_login_google_v0(request: Request, body: RegisterLoginGoogleV0):
     google_id = body.google_id
     try:
         """
         validation
         """
-        # pass
+        rate_limit_response = get_rate_limit_response(request)
+        if rate_limit_response is not None:
+            return rate_limit_response
 
-        decoded_google_id = jwt.decode(google_id, options={"verify_signature": False})
-        if decoded_google_id["email"] not in config_list_admin_allowed_emails:
+        if is_google_id_token_verification_enabled():
+            decoded_google_id = await verify_google_id_token(google_id)
+        else:
+            decoded_google_id = jwt.decode(
+                google_id, options={"verify_signature": False}
+            )
+        if decoded_google_id["email"] not in get_settings().admin_allowed_emails:
             output_content = get_api_output_in_standard_format(
                 message=messages["UNAUTHORIZED"],
                 log=f"{str(decoded_google_id["email"])} is not in allowed email list.",
@@ -773,40 +736,30 @@ def util_register_login_google_v0(body: RegisterLoginGoogleV0):
         """
         main process
         """
-        response = global_object_square_authentication_helper.register_login_google_v0(
+        response = await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.register_login_google_v0,
             google_id=google_id,
             assign_app_id_if_missing=False,
-            app_id=global_int_app_id,
-            response_as_pydantic=True,
+            app_id=get_app_id(),
         )
         """
         return value
         """
-        refresh_token = response.data.main.refresh_token
-        refresh_token_expiry_time = response.data.main.refresh_token_expiry_time
-        modified_response = response.model_dump()
-        del modified_response["data"]["main"]["refresh_token"]
-        del modified_response["data"]["main"]["refresh_token_expiry_time"]
-        output_content = get_api_output_in_standard_format(
-            message=messages["LOGIN_SUCCESSFUL"],
-            data=RegisterLoginGoogleV0Response(
-                **modified_response["data"]
-            ).model_dump(),
-            as_dict=False,
-        )
-        json_response = JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+        refresh_token = response["data"]["main"].pop("refresh_token")
+        refresh_token_expiry_time = response["data"]["main"].pop(
+            "refresh_token_expiry_time"
+        )
+        output_content = {
+            "data": response["data"],
+            "message": messages["LOGIN_SUCCESSFUL"],
+        }
+        json_response = (
+            global_object_register_login_google_v0_response_serializer.get_response(
+                output_content
+            )
         )
         json_response.set_cookie(
-            **create_cookie(
-                key="refresh_token|" + str(global_int_app_id),
-                value=refresh_token,
-                domain=config_str_cookie_domain,
-                expires=datetime.fromisoformat(refresh_token_expiry_time),
-                secure=is_https(),
-                http_only=True,
-            )
+            **create_refresh_token_cookie(refresh_token, refresh_token_expiry_time)
         )
         return json_response
     except HTTPError as http_error:
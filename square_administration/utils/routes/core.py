@@ -1,117 +1,1009 @@
+import asyncio
+import csv
+import functools
+import io
 import json
-from typing import Annotated
+import time
+from datetime import datetime
+from typing import Annotated, AsyncIterator, Dict, List, Literal, Optional
 
 from fastapi import Header, status, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from requests import HTTPError
-from square_authentication_helper import TokenType
 from square_commons import get_api_output_in_standard_format
 from square_commons.api_utils import StandardResponse
 from square_database_helper import FiltersV0
 from square_database_helper.pydantic_models import FilterConditionsV0
 from square_database_structure.square import global_string_database_name
-from square_database_structure.square.authentication import (
-    global_string_schema_name as global_string_schema_name_authentication,
-)
 from square_database_structure.square.authentication.tables import User
 from square_database_structure.square.greeting import global_string_schema_name
 from square_database_structure.square.greeting.tables import Greeting
 
 from square_administration.configuration import (
+    config_float_greeting_feed_heartbeat_interval,
+    config_int_greeting_delete_batch_size,
+    config_int_greeting_export_page_size,
+    config_int_greeting_max_page_size,
     global_object_square_logger,
     global_object_square_database_helper,
-    global_object_square_authentication_helper,
 )
 from square_administration.messages import messages
 from square_administration.pydantic_models.core import (
+    DeleteGreetingsV0,
+    DeleteGreetingsV0Batch,
+    DeleteGreetingsV0Response,
     GetAllGreetingsV0,
     GetAllGreetingsV0Response,
+    GetAllGreetingsV0ResponseMain,
+    GetCacheStatsV0Response,
+    GetGreetingStatsV0Response,
+    GreetingSenderV0,
+    GreetingStatsV0,
+    SearchGreetingsV0,
+    SearchGreetingsV0Response,
+    SearchGreetingsV0ResponseMain,
+)
+from square_administration.utils.cache import (
+    CachedResponse,
+    get_cached_response,
+    get_conditional_json_response,
+)
+from square_administration.utils.concurrency import run_in_upstream_thread_pool
+from square_administration.utils.greeting import (
+    add_user_usernames,
+    count_greetings_in_range,
+    get_approximate_greetings_count,
+    get_greetings_generation,
+    global_object_greetings_count_cache,
+    global_object_greetings_page_single_flight,
+    global_object_greetings_response_cache,
+    invalidate_greeting_caches,
+    iterate_greeting_pages,
+    set_approximate_greetings_count,
+)
+from square_administration.utils.greeting_feed import global_object_greeting_feed
+from square_administration.utils.greeting_search import (
+    get_search_terms,
+    global_object_greeting_search_index,
+)
+from square_administration.utils.greeting_stats import global_object_greeting_stats
+from square_administration.utils.pagination import (
+    KeysetCursor,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+    get_keyset_direction,
+    get_keyset_order_by,
+    get_next_keyset_cursor,
+)
+from square_administration.utils.serialization import ResponseSerializer
+from square_administration.utils.token import (
+    get_access_token_payload,
+    global_object_access_token_cache,
+    global_object_refresh_token_payload_cache,
+)
+from square_administration.utils.user import (
+    get_user_username_map,
+    global_object_username_cache,
+)
+
+# response types are parametrized and compiled once instead of per request.
+global_object_get_all_greetings_v0_response_serializer = ResponseSerializer(
+    StandardResponse[GetAllGreetingsV0Response]
+)
+global_object_get_cache_stats_v0_response_serializer = ResponseSerializer(
+    StandardResponse[GetCacheStatsV0Response]
+)
+global_object_get_greeting_stats_v0_response_serializer = ResponseSerializer(
+    StandardResponse[GetGreetingStatsV0Response]
+)
+global_object_search_greetings_v0_response_serializer = ResponseSerializer(
+    StandardResponse[SearchGreetingsV0Response]
 )
-from square_administration.utils.common import global_int_app_id
+global_object_delete_greetings_v0_response_serializer = ResponseSerializer(
+    StandardResponse[DeleteGreetingsV0Response]
+)
+
+
+async def _get_greetings_page(
+    cache_key: str,
+    filters: Dict[str, FilterConditionsV0],
+    datetime_from: Optional[datetime],
+    datetime_to: Optional[datetime],
+    order_by: List[str],
+    limit: int,
+    offset: int,
+    keyset_descending: Optional[bool],
+    decoded_cursor: Optional[KeysetCursor],
+    fields: Optional[List[str]],
+    total_count_mode: Literal["exact", "approximate", "none"],
+    greetings_generation: int,
+) -> CachedResponse:
+    page_filters = dict(filters)
+    columns = None
+    if fields is not None:
+        # keyset pagination needs greeting_datetime, the username join needs user_id.
+        column_set = {Greeting.greeting_id.name, *fields}
+        if keyset_descending is not None:
+            column_set.add(Greeting.greeting_datetime.name)
+        if User.user_username.name in column_set:
+            column_set.remove(User.user_username.name)
+            column_set.add(Greeting.user_id.name)
+        columns = sorted(column_set)
+    if keyset_descending is not None:
+        # greeting_id as tie break keeps pages stable for equal datetimes.
+        order_by = get_keyset_order_by(
+            Greeting.greeting_datetime.name,
+            Greeting.greeting_id.name,
+            keyset_descending,
+        )
+    # only one greeting_datetime condition can be pushed down: the bound pages
+    # start from. the trailing bound is applied to the (ordered) rows below.
+    leading_condition = None
+    trailing_datetime = None
+    if decoded_cursor is not None:
+        if keyset_descending:
+            leading_condition = FilterConditionsV0(lte=decoded_cursor.value)
+            trailing_datetime = datetime_from
+        else:
+            leading_condition = FilterConditionsV0(gte=decoded_cursor.value)
+            trailing_datetime = datetime_to
+        offset = decoded_cursor.skip
+    elif datetime_from is not None and datetime_to is not None:
+        if keyset_descending:
+            leading_condition = FilterConditionsV0(lt=datetime_to.isoformat())
+            trailing_datetime = datetime_from
+        else:
+            leading_condition = FilterConditionsV0(gte=datetime_from.isoformat())
+            trailing_datetime = datetime_to
+    elif datetime_from is not None:
+        leading_condition = FilterConditionsV0(gte=datetime_from.isoformat())
+    elif datetime_to is not None:
+        leading_condition = FilterConditionsV0(lt=datetime_to.isoformat())
+    if leading_condition is not None:
+        page_filters[Greeting.greeting_datetime.name] = leading_condition
+    page_coroutine = run_in_upstream_thread_pool(
+        global_object_square_database_helper.get_rows_v0,
+        database_name=global_string_database_name,
+        schema_name=global_string_schema_name,
+        table_name=Greeting.__tablename__,
+        filters=FiltersV0(root=page_filters),
+        apply_filters=bool(page_filters),
+        columns=columns,
+        order_by=order_by,
+        limit=limit,
+        offset=offset,
+    )
+    if total_count_mode == "none":
+        response = await page_coroutine
+        total_count = None
+    elif decoded_cursor is None and trailing_datetime is None:
+        # the page query already counts exactly the requested rows.
+        response = await page_coroutine
+        total_count = response["data"]["total_count"]
+        if total_count_mode == "approximate":
+            set_approximate_greetings_count(
+                filters, datetime_from, datetime_to, total_count, greetings_generation
+            )
+    else:
+        # the page query only counts rows within the pushed down bound.
+        if total_count_mode == "approximate":
+            count_coroutine = get_approximate_greetings_count(
+                filters, datetime_from, datetime_to
+            )
+        else:
+            count_coroutine = count_greetings_in_range(
+                filters, datetime_from, datetime_to
+            )
+        response, total_count = await asyncio.gather(page_coroutine, count_coroutine)
+    greetings = response["data"]["main"]
+    reached_trailing_datetime = False
+    if trailing_datetime is not None:
+        in_range_greetings = []
+        for greeting in greetings:
+            greeting_datetime = datetime.fromisoformat(
+                greeting[Greeting.greeting_datetime.name]
+            )
+            if (
+                greeting_datetime < trailing_datetime
+                if keyset_descending
+                else greeting_datetime >= trailing_datetime
+            ):
+                reached_trailing_datetime = True
+                break
+            in_range_greetings.append(greeting)
+        greetings = in_range_greetings
+    next_cursor = None
+    if (
+        keyset_descending is not None
+        and not reached_trailing_datetime
+        and offset + len(greetings) < response["data"]["total_count"]
+    ):
+        next_keyset_cursor = get_next_keyset_cursor(
+            greetings,
+            Greeting.greeting_datetime.name,
+            Greeting.greeting_id.name,
+            keyset_descending,
+            decoded_cursor,
+            offset,
+        )
+        if next_keyset_cursor is not None:
+            next_cursor = encode_keyset_cursor(next_keyset_cursor)
+
+    if fields is None or User.user_username.name in fields:
+        greetings = await add_user_usernames(greetings)
+    output_content = {
+        "data": {
+            "main": greetings,
+            "total_count": total_count,
+            "next_cursor": next_cursor,
+        },
+        "message": response["message"],
+        "log": response["log"],
+    }
+
+    exclude = None
+    if fields is not None:
+        exclude = {
+            "data": {
+                "main": {
+                    "__all__": set(GetAllGreetingsV0ResponseMain.model_fields)
+                    - {Greeting.greeting_id.name, *fields}
+                }
+            }
+        }
+    cached_response = get_cached_response(
+        global_object_get_all_greetings_v0_response_serializer.to_json(
+            output_content, exclude=exclude
+        )
+    )
+    # a page read before greetings were changed may still show removed rows.
+    if greetings_generation == get_greetings_generation():
+        global_object_greetings_response_cache.set(cache_key, cached_response)
+    return cached_response
 
 
 @global_object_square_logger.auto_logger()
-def util_get_all_greetings_v0(
-    access_token: Annotated[str, Header()], body: GetAllGreetingsV0
+async def util_get_all_greetings_v0(
+    access_token: Annotated[str, Header()],
+    body: GetAllGreetingsV0,
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
     order_by = body.order_by
-    limit = body.limit
+    limit = min(
+        body.limit or config_int_greeting_max_page_size,
+        config_int_greeting_max_page_size,
+    )
     offset = body.offset
+    cursor = body.cursor
 
     try:
         """
         validation
         """
-        access_token_payload = global_object_square_authentication_helper.validate_and_get_payload_from_token_v0(
-            token=access_token,
-            token_type=TokenType.access_token,
-            app_id=global_int_app_id,
-            response_as_pydantic=True,
-        ).data.main
-        if access_token_payload["app_id"] != global_int_app_id:
+        await get_access_token_payload(access_token)
+
+        keyset_descending = get_keyset_direction(
+            order_by, Greeting.greeting_datetime.name, Greeting.greeting_id.name
+        )
+        decoded_cursor = None
+        if cursor is not None:
+            if keyset_descending is None:
+                output_content = get_api_output_in_standard_format(
+                    message=messages["GENERIC_400"],
+                    log=f"cursor can only be used when ordering by {Greeting.greeting_datetime.name}.",
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=output_content,
+                )
+            if offset:
+                output_content = get_api_output_in_standard_format(
+                    message=messages["GENERIC_400"],
+                    log="cursor and offset can not be used together.",
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=output_content,
+                )
+            try:
+                decoded_cursor = decode_keyset_cursor(cursor)
+            except ValueError as value_error:
+                output_content = get_api_output_in_standard_format(
+                    message=messages["GENERIC_400"],
+                    log=str(value_error),
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=output_content,
+                )
+            if decoded_cursor.descending != keyset_descending:
+                output_content = get_api_output_in_standard_format(
+                    message=messages["GENERIC_400"],
+                    log="cursor was created for a different order_by.",
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=output_content,
+                )
+        fields = None
+        if body.fields is not None:
+            unknown_fields = set(body.fields) - set(
+                GetAllGreetingsV0ResponseMain.model_fields
+            )
+            if unknown_fields:
+                output_content = get_api_output_in_standard_format(
+                    message=messages["GENERIC_400"],
+                    log=f"invalid fields: {sorted(unknown_fields)}.",
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=output_content,
+                )
+            fields = sorted(set(body.fields))
+        if (
+            body.greeting_datetime_from is not None
+            and body.greeting_datetime_to is not None
+        ):
+            if body.greeting_datetime_from >= body.greeting_datetime_to:
+                output_content = get_api_output_in_standard_format(
+                    message=messages["GENERIC_400"],
+                    log="greeting_datetime_from must be before greeting_datetime_to.",
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=output_content,
+                )
+            if keyset_descending is None:
+                output_content = get_api_output_in_standard_format(
+                    message=messages["GENERIC_400"],
+                    log=f"greeting_datetime_from and greeting_datetime_to can only be combined when ordering by {Greeting.greeting_datetime.name}.",
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=output_content,
+                )
+
+        """
+        main process
+        """
+        filters = {}
+        if body.greeting_is_anonymous is not None:
+            filters[Greeting.greeting_is_anonymous.name] = FilterConditionsV0(
+                eq=body.greeting_is_anonymous
+            )
+        if body.user_id is not None:
+            filters[Greeting.user_id.name] = FilterConditionsV0(eq=body.user_id)
+        cache_key = body.model_copy(
+            update={"limit": limit, "fields": fields}
+        ).model_dump_json()
+        cached_response = global_object_greetings_response_cache.get(cache_key)
+        if cached_response is None:
+            greetings_generation = get_greetings_generation()
+            cached_response = await global_object_greetings_page_single_flight.do(
+                (greetings_generation, cache_key),
+                functools.partial(
+                    _get_greetings_page,
+                    cache_key=cache_key,
+                    filters=filters,
+                    datetime_from=body.greeting_datetime_from,
+                    datetime_to=body.greeting_datetime_to,
+                    order_by=order_by,
+                    limit=limit,
+                    offset=offset,
+                    keyset_descending=keyset_descending,
+                    decoded_cursor=decoded_cursor,
+                    fields=fields,
+                    total_count_mode=body.total_count_mode,
+                    greetings_generation=greetings_generation,
+                ),
+            )
+
+        """
+        return value
+        """
+        return get_conditional_json_response(cached_response, if_none_match)
+    except HTTPError as http_error:
+        global_object_square_logger.logger.error(http_error, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_error.response.status_code,
+            content=json.loads(http_error.response.content),
+        )
+    except HTTPException as http_exception:
+        global_object_square_logger.logger.error(http_exception, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_exception.status_code, content=http_exception.detail
+        )
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"],
+            log=str(e),
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@global_object_square_logger.auto_logger()
+async def util_get_cache_stats_v0(access_token: Annotated[str, Header()]):
+    try:
+        """
+        validation
+        """
+        await get_access_token_payload(access_token)
+        """
+        main process
+        """
+        cache_stats = {
+            "username": global_object_username_cache.get_stats(),
+            "greetings_response": global_object_greetings_response_cache.get_stats(),
+            "greetings_count": global_object_greetings_count_cache.get_stats(),
+            "access_token": global_object_access_token_cache.get_stats(),
+            "refresh_token_payload": global_object_refresh_token_payload_cache.get_stats(),
+        }
+        """
+        return value
+        """
+        output_content = {
+            "data": GetCacheStatsV0Response(main=cache_stats),
+            "message": messages["GENERIC_READ_SUCCESSFUL"],
+        }
+        return global_object_get_cache_stats_v0_response_serializer.get_response(
+            output_content
+        )
+    except HTTPError as http_error:
+        global_object_square_logger.logger.error(http_error, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_error.response.status_code,
+            content=json.loads(http_error.response.content),
+        )
+    except HTTPException as http_exception:
+        global_object_square_logger.logger.error(http_exception, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_exception.status_code, content=http_exception.detail
+        )
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"],
+            log=str(e),
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+async def _iterate_greetings_export(
+    export_format: Literal["ndjson", "csv"],
+) -> AsyncIterator[str]:
+    field_names = list(GetAllGreetingsV0ResponseMain.model_fields.keys())
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=field_names)
+        writer.writeheader()
+        yield buffer.getvalue()
+    try:
+        async for greetings in iterate_greeting_pages(
+            config_int_greeting_export_page_size
+        ):
+            rows = [
+                GetAllGreetingsV0ResponseMain.model_validate(greeting)
+                for greeting in greetings
+            ]
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=field_names)
+                writer.writerows(row.model_dump() for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(row.model_dump_json() + "\n" for row in rows)
+    except Exception as e:
+        # status and headers are already sent, the client sees a truncated body.
+        global_object_square_logger.logger.error(e, exc_info=True)
+        raise
+
+
+@global_object_square_logger.auto_logger()
+async def util_export_greetings_v0(
+    access_token: Annotated[str, Header()],
+    export_format: Literal["ndjson", "csv"],
+):
+    try:
+        """
+        validation
+        """
+        await get_access_token_payload(access_token)
+        """
+        main process
+        """
+        if export_format == "csv":
+            media_type = "text/csv"
+        else:
+            media_type = "application/x-ndjson"
+        """
+        return value
+        """
+        return StreamingResponse(
+            _iterate_greetings_export(export_format),
+            status_code=status.HTTP_200_OK,
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="greetings.{export_format}"'
+            },
+        )
+    except HTTPError as http_error:
+        global_object_square_logger.logger.error(http_error, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_error.response.status_code,
+            content=json.loads(http_error.response.content),
+        )
+    except HTTPException as http_exception:
+        global_object_square_logger.logger.error(http_exception, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_exception.status_code, content=http_exception.detail
+        )
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+async def _iterate_greetings_feed(expires_at: Optional[float]) -> AsyncIterator[str]:
+    queue = global_object_greeting_feed.subscribe()
+    try:
+        while True:
+            timeout = config_float_greeting_feed_heartbeat_interval
+            if expires_at is not None:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    # the client reconnects with a fresh access token.
+                    return
+                timeout = min(timeout, remaining)
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                return
+            greeting_id, data = item
+            yield f"id: {greeting_id}\nevent: greeting\ndata: {data}\n\n"
+    finally:
+        global_object_greeting_feed.unsubscribe(queue)
+
+
+@global_object_square_logger.auto_logger()
+async def util_get_greetings_feed_v0(
+    access_token: Optional[str],
+):
+    try:
+        """
+        validation
+        """
+        if access_token is None:
+            output_content = get_api_output_in_standard_format(
+                message=messages["INCORRECT_ACCESS_TOKEN"],
+                log="access token not found in the access_token header or query parameter.",
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=output_content,
+            )
+        access_token_payload = await get_access_token_payload(access_token)
+        """
+        main process
+        """
+        expires_at = access_token_payload.get("exp")
+        """
+        return value
+        """
+        return StreamingResponse(
+            _iterate_greetings_feed(expires_at),
+            status_code=status.HTTP_200_OK,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except HTTPError as http_error:
+        global_object_square_logger.logger.error(http_error, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_error.response.status_code,
+            content=json.loads(http_error.response.content),
+        )
+    except HTTPException as http_exception:
+        global_object_square_logger.logger.error(http_exception, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_exception.status_code, content=http_exception.detail
+        )
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+@global_object_square_logger.auto_logger()
+async def util_get_greeting_stats_v0(
+    access_token: Annotated[str, Header()],
+    top_senders_limit: int,
+):
+    try:
+        """
+        validation
+        """
+        await get_access_token_payload(access_token)
+        if not 1 <= top_senders_limit <= config_int_greeting_max_page_size:
             output_content = get_api_output_in_standard_format(
-                message=messages["INCORRECT_ACCESS_TOKEN"], log="app id is incorrect."
+                message=messages["GENERIC_400"],
+                log=f"top_senders_limit must be between 1 and {config_int_greeting_max_page_size}.",
             )
-            return HTTPException(
+            raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=output_content,
             )
+        """
+        main process
+        """
+        await global_object_greeting_stats.refresh()
+        # copied before the next await, a concurrent rebuild may swap the state.
+        greeting_stats = global_object_greeting_stats.get_snapshot(top_senders_limit)
+        user_map = await get_user_username_map(x for x, _ in greeting_stats.top_senders)
+        """
+        return value
+        """
+        output_content = {
+            "data": GetGreetingStatsV0Response(
+                main=GreetingStatsV0(
+                    total_count=greeting_stats.total_count,
+                    anonymous_count=greeting_stats.anonymous_count,
+                    named_count=greeting_stats.total_count
+                    - greeting_stats.anonymous_count,
+                    per_day=greeting_stats.per_day,
+                    per_week=greeting_stats.per_week,
+                    top_senders=[
+                        GreetingSenderV0(
+                            user_id=user_id,
+                            user_username=user_map.get(user_id),
+                            greeting_count=greeting_count,
+                        )
+                        for user_id, greeting_count in greeting_stats.top_senders
+                    ],
+                    last_greeting_id=greeting_stats.last_greeting_id,
+                )
+            ),
+            "message": messages["GENERIC_READ_SUCCESSFUL"],
+        }
+        return global_object_get_greeting_stats_v0_response_serializer.get_response(
+            output_content
+        )
+    except HTTPError as http_error:
+        global_object_square_logger.logger.error(http_error, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_error.response.status_code,
+            content=json.loads(http_error.response.content),
+        )
+    except HTTPException as http_exception:
+        global_object_square_logger.logger.error(http_exception, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_exception.status_code, content=http_exception.detail
+        )
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
 
+@global_object_square_logger.auto_logger()
+async def util_search_greetings_v0(
+    access_token: Annotated[str, Header()],
+    body: SearchGreetingsV0,
+):
+    limit = min(
+        body.limit or config_int_greeting_max_page_size,
+        config_int_greeting_max_page_size,
+    )
+    try:
+        """
+        validation
+        """
+        await get_access_token_payload(access_token)
+        terms = get_search_terms(body.query)
+        if not terms:
+            output_content = get_api_output_in_standard_format(
+                message=messages["GENERIC_400"],
+                log="query does not contain any searchable words.",
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=output_content,
+            )
         """
         main process
         """
-        response = global_object_square_database_helper.get_rows_v0(
+        await global_object_greeting_search_index.refresh()
+        total_count, hits = global_object_greeting_search_index.search(
+            terms, limit, body.offset
+        )
+        greetings = await add_user_usernames([greeting for greeting, _ in hits])
+        """
+        return value
+        """
+        output_content = {
+            "data": SearchGreetingsV0Response(
+                main=[
+                    SearchGreetingsV0ResponseMain(**greeting, score=score)
+                    for greeting, (_, score) in zip(greetings, hits)
+                ],
+                total_count=total_count,
+            ),
+            "message": messages["GENERIC_READ_SUCCESSFUL"],
+        }
+        return global_object_search_greetings_v0_response_serializer.get_response(
+            output_content
+        )
+    except HTTPError as http_error:
+        global_object_square_logger.logger.error(http_error, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_error.response.status_code,
+            content=json.loads(http_error.response.content),
+        )
+    except HTTPException as http_exception:
+        global_object_square_logger.logger.error(http_exception, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        return JSONResponse(
+            status_code=http_exception.status_code, content=http_exception.detail
+        )
+    except Exception as e:
+        global_object_square_logger.logger.error(e, exc_info=True)
+        """
+        rollback logic
+        """
+        # pass
+        output_content = get_api_output_in_standard_format(
+            message=messages["GENERIC_500"], log=str(e)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
+        )
+
+
+async def _delete_greetings_batch(greeting_ids: List[int]) -> DeleteGreetingsV0Batch:
+    try:
+        response = await run_in_upstream_thread_pool(
+            global_object_square_database_helper.delete_rows_v0,
             database_name=global_string_database_name,
             schema_name=global_string_schema_name,
             table_name=Greeting.__tablename__,
-            filters=FiltersV0(root={}),
-            apply_filters=False,
-            order_by=order_by,
-            limit=limit,
-            offset=offset,
+            filters=FiltersV0(
+                root={Greeting.greeting_id.name: FilterConditionsV0(in_=greeting_ids)}
+            ),
             response_as_pydantic=True,
         )
-        all_user_ids = {
-            x[Greeting.user_id.name]
-            for x in response.data.main
-            if x[Greeting.user_id.name] is not None
-        }
-        user_response = global_object_square_database_helper.get_rows_v0(
+    except HTTPError as http_error:
+        global_object_square_logger.logger.error(http_error, exc_info=True)
+        return DeleteGreetingsV0Batch(
+            requested_count=len(greeting_ids),
+            deleted_count=0,
+            log=http_error.response.text,
+        )
+    return DeleteGreetingsV0Batch(
+        requested_count=len(greeting_ids),
+        deleted_count=response.data.affected_count,
+    )
+
+
+async def _delete_filtered_greetings(
+    filters: Dict[str, FilterConditionsV0],
+    datetime_to: Optional[datetime],
+    batches: List[DeleteGreetingsV0Batch],
+) -> None:
+    """
+    walk matching greeting_ids in keyset order and delete each page as one batch.
+    datetime_to is checked locally when greeting_datetime already has a condition.
+    """
+    after_greeting_id = 0
+    while True:
+        response = await run_in_upstream_thread_pool(
+            global_object_square_database_helper.get_rows_v0,
             database_name=global_string_database_name,
-            schema_name=global_string_schema_name_authentication,
-            table_name=User.__tablename__,
+            schema_name=global_string_schema_name,
+            table_name=Greeting.__tablename__,
             filters=FiltersV0(
-                root={User.user_id.name: FilterConditionsV0(in_=list(all_user_ids))}
+                root={
+                    **filters,
+                    Greeting.greeting_id.name: FilterConditionsV0(gt=after_greeting_id),
+                }
             ),
-            columns=[
-                User.user_id.name,
-                User.user_username.name,
-            ],
+            columns=[Greeting.greeting_id.name, Greeting.greeting_datetime.name],
+            order_by=[Greeting.greeting_id.name],
+            limit=config_int_greeting_delete_batch_size,
             response_as_pydantic=True,
-        ).data.main
-        user_map = {
-            x[User.user_id.name]: x[User.user_username.name] for x in user_response
-        }
-        response_clone = response
-        response_clone.data.main = [
-            {
-                **greeting,
-                User.user_username.name: user_map.get(greeting[Greeting.user_id.name]),
-            }
-            for greeting in response.data.main
+        )
+        greetings = response.data.main
+        greeting_ids = [
+            x[Greeting.greeting_id.name]
+            for x in greetings
+            if datetime_to is None
+            or datetime.fromisoformat(x[Greeting.greeting_datetime.name]) < datetime_to
         ]
+        if greeting_ids:
+            batches.append(await _delete_greetings_batch(greeting_ids))
+        if len(greetings) < config_int_greeting_delete_batch_size:
+            return
+        after_greeting_id = greetings[-1][Greeting.greeting_id.name]
 
+
+@global_object_square_logger.auto_logger()
+async def util_delete_greetings_v0(
+    access_token: Annotated[str, Header()],
+    body: DeleteGreetingsV0,
+):
+    batches = []
+    try:
         """
-        return value
+        validation
         """
-
-        output_content = StandardResponse[GetAllGreetingsV0Response](
-            **response_clone.model_dump()
+        await get_access_token_payload(access_token)
+        has_filters = any(
+            x is not None
+            for x in (
+                body.greeting_is_anonymous,
+                body.user_id,
+                body.greeting_datetime_from,
+                body.greeting_datetime_to,
+            )
         )
-
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=output_content.model_dump(),
+        if (body.greeting_ids is None) == (not has_filters):
+            output_content = get_api_output_in_standard_format(
+                message=messages["GENERIC_400"],
+                log="provide either greeting_ids or filters.",
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=output_content,
+            )
+        if (
+            body.greeting_datetime_from is not None
+            and body.greeting_datetime_to is not None
+            and body.greeting_datetime_from >= body.greeting_datetime_to
+        ):
+            output_content = get_api_output_in_standard_format(
+                message=messages["GENERIC_400"],
+                log="greeting_datetime_from must be before greeting_datetime_to.",
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=output_content,
+            )
+        """
+        main process
+        """
+        try:
+            if body.greeting_ids is not None:
+                greeting_ids = sorted(set(body.greeting_ids))
+                for index in range(
+                    0, len(greeting_ids), config_int_greeting_delete_batch_size
+                ):
+                    batches.append(
+                        await _delete_greetings_batch(
+                            greeting_ids[
+                                index : index + config_int_greeting_delete_batch_size
+                            ]
+                        )
+                    )
+            else:
+                filters = {}
+                if body.greeting_is_anonymous is not None:
+                    filters[Greeting.greeting_is_anonymous.name] = FilterConditionsV0(
+                        eq=body.greeting_is_anonymous
+                    )
+                if body.user_id is not None:
+                    filters[Greeting.user_id.name] = FilterConditionsV0(eq=body.user_id)
+                # one condition per column, the upper bound is checked locally
+                # when both bounds are given.
+                datetime_to = None
+                if body.greeting_datetime_from is not None:
+                    filters[Greeting.greeting_datetime.name] = FilterConditionsV0(
+                        gte=body.greeting_datetime_from.isoformat()
+                    )
+                    datetime_to = body.greeting_datetime_to
+                elif body.greeting_datetime_to is not None:
+                    filters[Greeting.greeting_datetime.name] = FilterConditionsV0(
+                        lt=body.greeting_datetime_to.isoformat()
+                    )
+                await _delete_filtered_greetings(filters, datetime_to, batches)
+        finally:
+            if batches:
+                invalidate_greeting_caches()
+        """
+        return value
+        """
+        output_content = {
+            "data": DeleteGreetingsV0Response(
+                main=batches,
+                deleted_count=sum(x.deleted_count for x in batches),
+            ),
+            "message": messages["GENERIC_DELETE_SUCCESSFUL"],
+        }
+        return global_object_delete_greetings_v0_response_serializer.get_response(
+            output_content
         )
     except HTTPError as http_error:
         global_object_square_logger.logger.error(http_error, exc_info=True)
@@ -139,8 +1031,7 @@ def util_get_all_greetings_v0(
         """
         # pass
         output_content = get_api_output_in_standard_format(
-            message=messages["GENERIC_500"],
-            log=str(e),
+            message=messages["GENERIC_500"], log=str(e)
         )
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=output_content
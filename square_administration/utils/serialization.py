@@ -0,0 +1,33 @@
+from typing import Any, Generic, Type, TypeVar
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class ResponseSerializer(Generic[T]):
+    """
+    response type parametrized and compiled once at import time.
+    a payload (plain dicts, e.g. upstream responses read with
+    response_as_pydantic=False, or already built models) is validated in one pass
+    and serialized straight to json bytes by pydantic-core.
+    """
+
+    def __init__(self, response_type: Type[T]):
+        self.response_type = response_type
+        self.type_adapter = TypeAdapter(response_type)
+
+    def to_json(self, payload: Any, **dump_json_kwargs: Any) -> bytes:
+        return self.type_adapter.dump_json(
+            self.type_adapter.validate_python(payload), **dump_json_kwargs
+        )
+
+    def get_response(
+        self, payload: Any, status_code: int = status.HTTP_200_OK
+    ) -> Response:
+        return Response(
+            content=self.to_json(payload),
+            status_code=status_code,
+            media_type="application/json",
+        )
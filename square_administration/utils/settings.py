@@ -0,0 +1,95 @@
+import asyncio
+import os
+import signal
+from dataclasses import dataclass
+from typing import FrozenSet
+
+from square_commons import ConfigReader
+
+from square_administration.configuration import (
+    config_file_path,
+    config_list_admin_allowed_emails,
+    config_sample_file_path,
+    config_str_cookie_domain,
+    config_str_ssl_crt_file_path,
+    config_str_ssl_key_file_path,
+    global_object_square_logger,
+    parse_config_list,
+)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    values read on the request path, computed once per (re)load.
+    is_https and everything else in config.ini is only read at startup.
+    """
+
+    admin_allowed_emails: FrozenSet[str]
+    cookie_domain: str
+    is_https: bool
+
+
+# uvicorn's tls setup is fixed at startup, so the cookie secure flag has to be too.
+_is_https = os.path.exists(config_str_ssl_key_file_path) and os.path.exists(
+    config_str_ssl_crt_file_path
+)
+
+
+def _create_settings(admin_allowed_emails: list[str], cookie_domain: str) -> Settings:
+    return Settings(
+        admin_allowed_emails=frozenset(admin_allowed_emails),
+        cookie_domain=cookie_domain,
+        is_https=_is_https,
+    )
+
+
+_settings = _create_settings(config_list_admin_allowed_emails, config_str_cookie_domain)
+
+
+def get_settings() -> Settings:
+    return _settings
+
+
+def reload_settings() -> None:
+    """
+    re-read config.ini and swap the settings in one assignment,
+    the current settings are kept if the file is invalid.
+    """
+    global _settings
+    try:
+        ldict_configuration = ConfigReader(
+            config_file_path, config_sample_file_path
+        ).read_configuration()
+        settings = _create_settings(
+            parse_config_list(
+                ldict_configuration["ENVIRONMENT"]["ADMIN_ALLOWED_EMAILS"]
+            ),
+            ldict_configuration["ENVIRONMENT"]["COOKIE_DOMAIN"],
+        )
+    except Exception as e:
+        global_object_square_logger.logger.error(
+            f"could not reload settings, keeping the current ones: {e}",
+            exc_info=True,
+        )
+        return
+    _settings = settings
+    global_object_square_logger.logger.info("settings reloaded.")
+
+
+def add_reload_signal_handler() -> bool:
+    """
+    reload settings on SIGHUP. returns False where that is not possible,
+    e.g. on windows or when the event loop does not run in the main thread.
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_settings)
+    except (NotImplementedError, RuntimeError, ValueError):
+        return False
+    return True
+
+
+def remove_reload_signal_handler() -> None:
+    asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
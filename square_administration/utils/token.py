@@ -0,0 +1,249 @@
+import functools
+import hashlib
+import os
+import time
+
+from typing import Optional
+
+import jwt
+from fastapi import HTTPException, Request, status
+from square_authentication_helper import TokenType
+from square_commons import get_api_output_in_standard_format
+
+from square_administration.configuration import (
+    config_float_access_token_cache_ttl,
+    config_float_refresh_token_cache_ttl,
+    config_int_access_token_cache_max_size,
+    config_int_refresh_token_cache_max_size,
+    config_int_server_workers,
+    config_str_secret_key_for_access_token,
+    global_object_square_authentication_helper,
+    global_object_square_logger,
+)
+from square_administration.messages import messages
+from square_administration.utils.batching import SingleFlight
+from square_administration.utils.cache import TTLCache
+from square_administration.utils.common import get_app_id, get_refresh_token_cookie_key
+from square_administration.utils.concurrency import run_in_upstream_thread_pool
+
+# generate_access_token_v0 responses keyed by refresh token hash.
+global_object_access_token_cache = TTLCache(
+    max_size=config_int_access_token_cache_max_size,
+    ttl=config_float_access_token_cache_ttl,
+)
+global_object_access_token_single_flight = SingleFlight()
+
+# validated refresh token payloads keyed by refresh token hash.
+global_object_refresh_token_payload_cache = TTLCache(
+    max_size=config_int_refresh_token_cache_max_size,
+    ttl=config_float_refresh_token_cache_ttl,
+)
+global_object_refresh_token_single_flight = SingleFlight()
+
+# logout_v0 and update_password_v0 only purge the caches of the worker handling them,
+# so with more than one worker process the two caches above are left empty.
+_is_token_cache_enabled = (config_int_server_workers or os.cpu_count()) == 1
+
+# bumped on every refresh token revocation. a validation or mint that was in flight
+# during a revocation does not write its result back into the caches above.
+_revocation_generation = 0
+
+
+def get_token_hash(token: str) -> str:
+    """
+    cache key for a token, so raw tokens are not kept as keys in memory.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _decode_access_token_locally(access_token: str) -> dict | None:
+    """
+    verify signature and expiry in process.
+    returns None when the token has to be checked by square_authentication instead.
+    """
+    if not config_str_secret_key_for_access_token:
+        return None
+    try:
+        return jwt.decode(
+            access_token,
+            config_str_secret_key_for_access_token,
+            algorithms=["HS256"],
+            options={"require": ["exp"]},
+        )
+    except jwt.InvalidSignatureError:
+        # most likely a rotated / mismatched secret, let square_authentication decide.
+        global_object_square_logger.logger.warning(
+            "local access token verification failed on signature, "
+            "falling back to square_authentication."
+        )
+        return None
+    except jwt.InvalidTokenError as invalid_token_error:
+        output_content = get_api_output_in_standard_format(
+            message=messages["INCORRECT_ACCESS_TOKEN"], log=str(invalid_token_error)
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=output_content,
+        )
+
+
+async def get_access_token_payload(access_token: str) -> dict:
+    """
+    validate an access token for this app and return its payload.
+    raises HTTPException (or requests.HTTPError from square_authentication) if invalid.
+    """
+    access_token_payload = _decode_access_token_locally(access_token)
+    if access_token_payload is None:
+        access_token_payload = (
+            await run_in_upstream_thread_pool(
+                global_object_square_authentication_helper.validate_and_get_payload_from_token_v0,
+                token=access_token,
+                token_type=TokenType.access_token,
+                app_id=get_app_id(),
+                response_as_pydantic=True,
+            )
+        ).data.main
+    if access_token_payload.get("app_id") != get_app_id():
+        output_content = get_api_output_in_standard_format(
+            message=messages["INCORRECT_ACCESS_TOKEN"], log="app id is incorrect."
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=output_content,
+        )
+    return access_token_payload
+
+
+def get_refresh_token(request: Request) -> Optional[str]:
+    """
+    dependency for the routes working on the refresh token cookie of this app.
+    """
+    return request.cookies.get(get_refresh_token_cookie_key())
+
+
+async def _validate_refresh_token(refresh_token: str) -> dict:
+    revocation_generation = _revocation_generation
+    refresh_token_payload = (
+        await run_in_upstream_thread_pool(
+            global_object_square_authentication_helper.validate_and_get_payload_from_token_v0,
+            refresh_token,
+            TokenType.refresh_token,
+            app_id=get_app_id(),
+            response_as_pydantic=True,
+        )
+    ).data.main
+    if refresh_token_payload["app_id"] != get_app_id():
+        output_content = get_api_output_in_standard_format(
+            message=messages["INCORRECT_REFRESH_TOKEN"],
+            log=f"refresh token is for different app id. intended app id: {get_app_id()}, actual app id: {refresh_token_payload['app_id']}.",
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=output_content,
+        )
+    refresh_token_payload_ttl = min(
+        config_float_refresh_token_cache_ttl,
+        refresh_token_payload.get("exp", 0) - time.time(),
+    )
+    if (
+        _is_token_cache_enabled
+        and refresh_token_payload_ttl > 0
+        and revocation_generation == _revocation_generation
+    ):
+        global_object_refresh_token_payload_cache.set(
+            get_token_hash(refresh_token),
+            refresh_token_payload,
+            ttl=refresh_token_payload_ttl,
+        )
+    return refresh_token_payload
+
+
+async def get_refresh_token_payload(refresh_token: str) -> dict:
+    """
+    validate a refresh token for this app and return its payload.
+    validated payloads are reused until REFRESH_TOKEN_CACHE_TTL or the token expiry,
+    whichever comes first, and concurrent callers share one upstream execution.
+    raises HTTPException (or requests.HTTPError from square_authentication) if invalid.
+    """
+    cache_key = get_token_hash(refresh_token)
+    refresh_token_payload = global_object_refresh_token_payload_cache.get(cache_key)
+    if refresh_token_payload is None:
+        refresh_token_payload = await global_object_refresh_token_single_flight.do(
+            cache_key, functools.partial(_validate_refresh_token, refresh_token)
+        )
+    return refresh_token_payload
+
+
+def _get_access_token_reuse_ttl(access_token: str) -> float:
+    """
+    ACCESS_TOKEN_CACHE_TTL capped at half of the remaining lifetime,
+    so a reused access token is never handed out close to its expiry.
+    """
+    try:
+        access_token_expiry = jwt.decode(
+            access_token, options={"verify_signature": False}
+        )["exp"]
+    except (jwt.InvalidTokenError, KeyError):
+        return 0
+    return min(
+        config_float_access_token_cache_ttl,
+        (access_token_expiry - time.time()) / 2,
+    )
+
+
+async def _generate_access_token(refresh_token: str) -> dict:
+    revocation_generation = _revocation_generation
+    await get_refresh_token_payload(refresh_token)
+    response = await run_in_upstream_thread_pool(
+        global_object_square_authentication_helper.generate_access_token_v0,
+        refresh_token=refresh_token,
+    )
+    access_token_reuse_ttl = _get_access_token_reuse_ttl(
+        response["data"]["main"]["access_token"]
+    )
+    if (
+        _is_token_cache_enabled
+        and access_token_reuse_ttl > 0
+        and revocation_generation == _revocation_generation
+    ):
+        global_object_access_token_cache.set(
+            get_token_hash(refresh_token), response, ttl=access_token_reuse_ttl
+        )
+    return response
+
+
+async def generate_access_token(refresh_token: str) -> dict:
+    """
+    validate a refresh token for this app and return the generate_access_token_v0
+    response. a recently minted access token is reused for the same refresh token,
+    and concurrent callers share one upstream execution.
+    raises HTTPException (or requests.HTTPError from square_authentication) if invalid.
+    """
+    cache_key = get_token_hash(refresh_token)
+    response = global_object_access_token_cache.get(cache_key)
+    if response is None:
+        response = await global_object_access_token_single_flight.do(
+            cache_key, functools.partial(_generate_access_token, refresh_token)
+        )
+    return response
+
+
+def invalidate_refresh_token(refresh_token: str) -> None:
+    """
+    to be called once a refresh token is revoked in square_authentication.
+    """
+    global _revocation_generation
+    _revocation_generation += 1
+    cache_key = get_token_hash(refresh_token)
+    global_object_refresh_token_payload_cache.invalidate(cache_key)
+    global_object_access_token_cache.invalidate(cache_key)
+
+
+def invalidate_all_refresh_tokens() -> None:
+    """
+    to be called once refresh tokens may have been revoked in bulk.
+    """
+    global _revocation_generation
+    _revocation_generation += 1
+    global_object_refresh_token_payload_cache.invalidate_all()
+    global_object_access_token_cache.invalidate_all()
@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, List
+
+from square_database_helper import FiltersV0
+from square_database_helper.pydantic_models import FilterConditionsV0
+from square_database_structure.square import global_string_database_name
+from square_database_structure.square.authentication import global_string_schema_name
+from square_database_structure.square.authentication.tables import User
+
+from square_administration.configuration import (
+    config_float_user_lookup_batch_window,
+    config_float_username_cache_ttl,
+    config_int_user_lookup_max_batch_size,
+    config_int_username_cache_max_size,
+    global_object_square_database_helper,
+)
+from square_administration.utils.batching import BatchLoader
+from square_administration.utils.cache import TTLCache
+from square_administration.utils.concurrency import run_in_upstream_thread_pool
+
+global_object_username_cache = TTLCache(
+    max_size=config_int_username_cache_max_size,
+    ttl=config_float_username_cache_ttl,
+)
+
+
+async def _load_user_usernames(user_ids: List[str]) -> Dict[str, str]:
+    user_response = (
+        await run_in_upstream_thread_pool(
+            global_object_square_database_helper.get_rows_v0,
+            database_name=global_string_database_name,
+            schema_name=global_string_schema_name,
+            table_name=User.__tablename__,
+            filters=FiltersV0(
+                root={User.user_id.name: FilterConditionsV0(in_=user_ids)}
+            ),
+            columns=[
+                User.user_id.name,
+                User.user_username.name,
+            ],
+            response_as_pydantic=True,
+        )
+    ).data.main
+    fetched_user_username_map = {
+        x[User.user_id.name]: x[User.user_username.name] for x in user_response
+    }
+    global_object_username_cache.set_many(fetched_user_username_map)
+    return fetched_user_username_map
+
+
+# concurrent requests share one User lookup per batch window.
+global_object_user_username_loader = BatchLoader(
+    batch_load=_load_user_usernames,
+    window=config_float_user_lookup_batch_window,
+    max_batch_size=config_int_user_lookup_max_batch_size,
+)
+
+
+async def get_user_username_map(user_ids: Iterable[str]) -> Dict[str, str]:
+    """
+    map user_id -> user_username, only cache misses are read from square_database.
+    unknown user ids are left out of the result.
+    """
+    user_username_map, missing_user_ids = global_object_username_cache.get_many(
+        set(user_ids)
+    )
+    if missing_user_ids:
+        user_username_map.update(
+            await global_object_user_username_loader.load_many(missing_user_ids)
+        )
+    return user_username_map
+
+
+def invalidate_user_username(user_id: str) -> None:
+    """
+    to be called whenever a username changes or a user leaves this app.
+    """
+    global_object_username_cache.invalidate(user_id)
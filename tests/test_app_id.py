@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from square_administration.utils import common
+
+
+def test_load_app_id_retries_and_writes_snapshot(monkeypatch, tmp_path):
+    snapshot_file_path = str(tmp_path / "app_id.json")
+    monkeypatch.setattr(
+        common, "config_str_app_id_snapshot_file_path", snapshot_file_path
+    )
+    monkeypatch.setattr(common, "config_float_app_id_resolve_backoff", 0)
+    results = [ConnectionError("down"), 7]
+
+    async def fake_fetch_app_id():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(common, "_fetch_app_id", fake_fetch_app_id)
+    assert asyncio.run(common.load_app_id()) is None
+    assert common.get_app_id() == 7
+    assert common._read_app_id_snapshot() == 7
+
+
+def test_load_app_id_starts_from_snapshot(monkeypatch, tmp_path):
+    snapshot_file_path = str(tmp_path / "app_id.json")
+    monkeypatch.setattr(
+        common, "config_str_app_id_snapshot_file_path", snapshot_file_path
+    )
+    common._write_app_id_snapshot(3)
+    fetched = asyncio.Event()
+
+    async def fake_fetch_app_id():
+        fetched.set()
+        return 4
+
+    monkeypatch.setattr(common, "_fetch_app_id", fake_fetch_app_id)
+
+    async def main():
+        refresh_task = await common.load_app_id()
+        assert common.get_app_id() == 3
+        await refresh_task
+        assert fetched.is_set()
+
+    asyncio.run(main())
+    assert common.get_app_id() == 4
+    assert common._read_app_id_snapshot() == 4
+
+
+def test_load_app_id_gives_up_after_attempts(monkeypatch):
+    monkeypatch.setattr(common, "config_str_app_id_snapshot_file_path", "")
+    monkeypatch.setattr(common, "config_int_app_id_resolve_attempts", 2)
+    monkeypatch.setattr(common, "config_float_app_id_resolve_backoff", 0)
+    attempts = []
+
+    async def fake_fetch_app_id():
+        attempts.append(1)
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(common, "_fetch_app_id", fake_fetch_app_id)
+    with pytest.raises(ConnectionError):
+        asyncio.run(common.load_app_id())
+    assert len(attempts) == 2
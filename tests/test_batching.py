@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from square_administration.utils.batching import BatchLoader, SingleFlight
+
+
+def _create_batch_loader(max_batch_size=100, error=None):
+    batches = []
+
+    async def batch_load(keys):
+        batches.append(sorted(keys))
+        await asyncio.sleep(0.01)
+        if error is not None:
+            raise error
+        return {key: key * 10 for key in keys if key > 0}
+
+    return BatchLoader(batch_load, window=0.001, max_batch_size=max_batch_size), batches
+
+
+def test_batch_loader_merges_concurrent_callers():
+    batch_loader, batches = _create_batch_loader()
+
+    async def main():
+        return await asyncio.gather(
+            batch_loader.load_many([1, 2]),
+            batch_loader.load_many([2, 3, 0]),
+        )
+
+    assert asyncio.run(main()) == [{1: 10, 2: 20}, {2: 20, 3: 30}]
+    assert batches == [[0, 1, 2, 3]]
+
+
+def test_batch_loader_joins_batch_in_flight():
+    batch_loader, batches = _create_batch_loader()
+
+    async def main():
+        first = asyncio.create_task(batch_loader.load_many([1, 2]))
+        # past the window, the first batch is running.
+        await asyncio.sleep(0.005)
+        second = await batch_loader.load_many([2, 3])
+        return await first, second
+
+    assert asyncio.run(main()) == ({1: 10, 2: 20}, {2: 20, 3: 30})
+    assert batches == [[1, 2], [3]]
+
+
+def test_batch_loader_splits_at_max_batch_size():
+    batch_loader, batches = _create_batch_loader(max_batch_size=2)
+    result = asyncio.run(batch_loader.load_many([1, 2, 3, 4, 5]))
+    assert result == {key: key * 10 for key in [1, 2, 3, 4, 5]}
+    assert sorted(len(x) for x in batches) == [1, 2, 2]
+
+
+def test_batch_loader_error_reaches_every_caller():
+    batch_loader, batches = _create_batch_loader(error=ConnectionError("down"))
+
+    async def main():
+        return await asyncio.gather(
+            batch_loader.load_many([1]),
+            batch_loader.load_many([1, 2]),
+            return_exceptions=True,
+        )
+
+    assert [type(x) for x in asyncio.run(main())] == [ConnectionError] * 2
+    assert len(batches) == 1
+
+
+def test_batch_loader_cancelled_caller_does_not_cancel_others():
+    batch_loader, batches = _create_batch_loader()
+
+    async def main():
+        cancelled = asyncio.create_task(batch_loader.load_many([1]))
+        other = asyncio.create_task(batch_loader.load_many([1]))
+        await asyncio.sleep(0.005)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await other
+
+    assert asyncio.run(main()) == {1: 10}
+    assert batches == [[1]]
+
+
+def test_single_flight_shares_one_execution():
+    single_flight = SingleFlight()
+    executions = []
+
+    async def load():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return "page"
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do("key", load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["page"] * 5
+    assert len(executions) == 1
+    assert single_flight.call_count == 1
+    assert single_flight.shared_count == 4
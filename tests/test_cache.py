@@ -0,0 +1,42 @@
+import time
+
+from square_administration.utils.cache import (
+    TTLCache,
+    get_cached_response,
+    get_conditional_json_response,
+)
+
+
+def test_ttl_cache_lru_eviction_and_counters():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    found, missing = cache.get_many(["a", "b", "c"])
+    assert found == {"a": 1, "c": 3}
+    assert missing == ["b"]
+    assert cache.get_stats() == {"size": 2, "max_size": 2, "hits": 3, "misses": 1}
+
+
+def test_ttl_cache_expiry_and_invalidation():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    cache.set("b", 2)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    cache.invalidate("b")
+    assert cache.get("b", "default") == "default"
+
+
+def test_conditional_json_response_etag():
+    cached_response = get_cached_response(b'{"data": 1}')
+    response = get_conditional_json_response(cached_response, None)
+    assert response.status_code == 200
+    assert response.body == b'{"data": 1}'
+    assert response.headers["etag"] == cached_response.etag
+    response = get_conditional_json_response(
+        cached_response, f'"other", W/{cached_response.etag}'
+    )
+    assert response.status_code == 304
+    assert response.body == b""
@@ -0,0 +1,26 @@
+import asyncio
+import time
+
+import pytest
+
+from square_administration.utils.concurrency import BoundedThreadPool, PoolFullError
+
+
+def test_bounded_thread_pool_rejects_beyond_queue():
+    pool = BoundedThreadPool(size=1, queue_size=1)
+
+    async def main():
+        return await asyncio.gather(
+            *(pool.run(time.sleep, 0.05) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], PoolFullError)
+    assert pool.rejected_count == 1
+    assert pool.admitted_count == 0
+
+
+def test_bounded_thread_pool_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        BoundedThreadPool(size=0, queue_size=1)
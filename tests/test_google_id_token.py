@@ -0,0 +1,114 @@
+import asyncio
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+
+from square_administration.utils import google_id_token
+from square_administration.utils.google_id_token import (
+    GoogleSigningKeys,
+    verify_google_id_token,
+)
+
+CLIENT_ID = "test-client-id.apps.googleusercontent.com"
+
+
+def _create_jwk(private_key, kid):
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    return {**jwk, "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+def _create_google_id(private_key, kid, **claims):
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "iat": now,
+        "exp": now + 3600,
+        "email": "admin@example.com",
+        "email_verified": True,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture()
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture()
+def jwks_file_path(tmp_path, private_key):
+    jwks_file_path = tmp_path / "certs.json"
+    jwks_file_path.write_text(json.dumps({"keys": [_create_jwk(private_key, "a")]}))
+    return jwks_file_path
+
+
+@pytest.fixture()
+def signing_keys(monkeypatch, jwks_file_path):
+    signing_keys = GoogleSigningKeys(source=str(jwks_file_path), refresh_interval=3600)
+    monkeypatch.setattr(
+        google_id_token, "global_object_google_signing_keys", signing_keys
+    )
+    monkeypatch.setattr(google_id_token, "config_str_google_client_id", CLIENT_ID)
+    return signing_keys
+
+
+def test_verify_google_id_token(signing_keys, private_key):
+    claims = asyncio.run(verify_google_id_token(_create_google_id(private_key, "a")))
+    assert claims["email"] == "admin@example.com"
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "other-client-id.apps.googleusercontent.com"},
+        {"iss": "https://accounts.example.com"},
+        {"iat": int(time.time()) - 7200, "exp": int(time.time()) - 3600},
+        {"email_verified": False},
+    ],
+)
+def test_verify_google_id_token_rejects_claims(signing_keys, private_key, claims):
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            verify_google_id_token(_create_google_id(private_key, "a", **claims))
+        )
+    assert exc_info.value.status_code == 401
+
+
+def test_verify_google_id_token_rejects_other_key(signing_keys):
+    other_private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with pytest.raises(HTTPException):
+        asyncio.run(verify_google_id_token(_create_google_id(other_private_key, "a")))
+
+
+def test_unknown_kid_reloads_signing_keys_rate_limited(
+    signing_keys, private_key, jwks_file_path
+):
+    rotated_private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    google_id = _create_google_id(rotated_private_key, "b")
+    asyncio.run(verify_google_id_token(_create_google_id(private_key, "a")))
+    assert signing_keys.load_count == 1
+
+    jwks_file_path.write_text(
+        json.dumps(
+            {
+                "keys": [
+                    _create_jwk(private_key, "a"),
+                    _create_jwk(rotated_private_key, "b"),
+                ]
+            }
+        )
+    )
+    # an unknown kid right after a load does not reload the keys.
+    with pytest.raises(HTTPException):
+        asyncio.run(verify_google_id_token(google_id))
+    assert signing_keys.load_count == 1
+
+    signing_keys._loaded_at -= google_id_token._MIN_RELOAD_INTERVAL + 1
+    claims = asyncio.run(verify_google_id_token(google_id))
+    assert claims["email"] == "admin@example.com"
+    assert signing_keys.load_count == 2
@@ -0,0 +1,74 @@
+import asyncio
+
+from square_administration.utils.greeting_search import (
+    GreetingSearchIndex,
+    get_search_terms,
+)
+
+
+def _get_greeting(greeting_id, greeting_text, greeting_anonymous_sender_name=None):
+    return {
+        "greeting_id": greeting_id,
+        "greeting_text": greeting_text,
+        "greeting_anonymous_sender_name": greeting_anonymous_sender_name,
+    }
+
+
+def _patch_greeting_table(monkeypatch, greetings, delay=0):
+    async def get_greetings_after(after_greeting_id, limit):
+        await asyncio.sleep(delay)
+        after_greetings = [
+            x for x in greetings if x["greeting_id"] > (after_greeting_id or 0)
+        ]
+        return after_greetings[:limit]
+
+    monkeypatch.setattr(
+        "square_administration.utils.greeting.get_greetings_after",
+        get_greetings_after,
+    )
+
+
+def test_greeting_search_index_ranking_and_paging(monkeypatch):
+    _patch_greeting_table(
+        monkeypatch,
+        [
+            _get_greeting(1, "Happy birthday!"),
+            _get_greeting(2, "happy happy birthday", "Birthday Bot"),
+            _get_greeting(3, "happy new year"),
+            _get_greeting(4, "merry christmas"),
+        ],
+    )
+    index = GreetingSearchIndex(refresh_interval=60, rebuild_interval=3600, page_size=3)
+    asyncio.run(index.refresh())
+    assert index.last_greeting_id == 4
+
+    total_count, hits = index.search(get_search_terms("HAPPY Birthday"), 10, 0)
+    assert total_count == 2
+    assert [greeting["greeting_id"] for greeting, _ in hits] == [2, 1]
+
+    total_count, hits = index.search(get_search_terms("happy"), 1, 1)
+    assert total_count == 3
+    assert [greeting["greeting_id"] for greeting, _ in hits] == [3]
+
+    assert index.search(get_search_terms("happy easter"), 10, 0) == (0, [])
+
+
+def test_greeting_search_index_serves_old_state_while_rebuilding(monkeypatch):
+    greetings = [_get_greeting(1, "happy birthday"), _get_greeting(2, "happy new year")]
+    _patch_greeting_table(monkeypatch, greetings, delay=0.01)
+    index = GreetingSearchIndex(
+        refresh_interval=60, rebuild_interval=3600, page_size=10
+    )
+
+    async def main():
+        await index.refresh()
+        del greetings[0]
+        index.reset()
+        # the rebuild runs in the background, the old state is served meanwhile.
+        await asyncio.wait_for(index.refresh(), 0.005)
+        assert index.search(get_search_terms("happy"), 10, 0)[0] == 2
+        await asyncio.sleep(0.05)
+        assert index.search(get_search_terms("happy"), 10, 0)[0] == 1
+        assert index.built_at is not None
+
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from square_administration.pydantic_models.core import GetAllGreetingsV0
+from square_administration.utils import greeting
+from square_administration.utils.routes import core
+
+
+def test_page_fetched_across_a_delete_is_not_cached(monkeypatch):
+    greetings = [
+        {"greeting_id": 2, "greeting_text": "happy new year"},
+        {"greeting_id": 1, "greeting_text": "happy birthday"},
+    ]
+    fetched = asyncio.Event()
+    deleted = asyncio.Event()
+    get_rows_calls = []
+
+    async def fake_get_access_token_payload(access_token):
+        return {}
+
+    async def fake_run_in_upstream_thread_pool(func, *args, **kwargs):
+        rows = list(greetings)
+        get_rows_calls.append(rows)
+        if len(get_rows_calls) == 1:
+            # greeting 1 is deleted while this page is in flight.
+            fetched.set()
+            await deleted.wait()
+        return {
+            "data": {"main": rows, "total_count": len(rows)},
+            "message": None,
+            "log": None,
+        }
+
+    monkeypatch.setattr(core, "get_access_token_payload", fake_get_access_token_payload)
+    monkeypatch.setattr(
+        core, "run_in_upstream_thread_pool", fake_run_in_upstream_thread_pool
+    )
+    greeting.invalidate_greeting_caches()
+    body = GetAllGreetingsV0(fields=["greeting_text"], order_by=["-greeting_id"])
+
+    async def get_greeting_ids():
+        response = await core.util_get_all_greetings_v0(
+            access_token="access-token", body=body
+        )
+        return [x["greeting_id"] for x in json.loads(response.body)["data"]["main"]]
+
+    async def main():
+        stale_page = asyncio.create_task(get_greeting_ids())
+        await fetched.wait()
+        del greetings[1]
+        greeting.invalidate_greeting_caches()
+        # started after the delete, so it must not join the stale computation.
+        fresh_page = asyncio.create_task(get_greeting_ids())
+        await asyncio.sleep(0)
+        deleted.set()
+        return await stale_page, await fresh_page, await get_greeting_ids()
+
+    assert asyncio.run(main()) == ([2, 1], [2], [2])
+    # the third request was served from the cache written by the fresh page.
+    assert len(get_rows_calls) == 2
@@ -0,0 +1,61 @@
+import pytest
+
+from square_administration.utils.pagination import (
+    KeysetCursor,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+    get_keyset_direction,
+    get_next_keyset_cursor,
+)
+
+
+def test_keyset_direction():
+    assert get_keyset_direction(
+        ["-greeting_datetime"], "greeting_datetime", "greeting_id"
+    )
+    assert (
+        get_keyset_direction(
+            ["greeting_datetime", "greeting_id"], "greeting_datetime", "greeting_id"
+        )
+        is False
+    )
+    assert (
+        get_keyset_direction(
+            ["greeting_datetime", "-greeting_id"], "greeting_datetime", "greeting_id"
+        )
+        is None
+    )
+    assert (
+        get_keyset_direction(["greeting_text"], "greeting_datetime", "greeting_id")
+        is None
+    )
+
+
+def test_cursor_round_trip():
+    cursor = KeysetCursor(
+        value="2024-01-01 00:00:00+00:00", id=7, skip=2, descending=True
+    )
+    assert decode_keyset_cursor(encode_keyset_cursor(cursor)) == cursor
+    with pytest.raises(ValueError):
+        decode_keyset_cursor("not a cursor")
+
+
+def test_next_cursor_counts_ties_across_pages():
+    rows = [
+        {"greeting_datetime": "b", "greeting_id": 4},
+        {"greeting_datetime": "a", "greeting_id": 3},
+        {"greeting_datetime": "a", "greeting_id": 2},
+    ]
+    first = get_next_keyset_cursor(
+        rows, "greeting_datetime", "greeting_id", True, None, 0
+    )
+    assert (first.value, first.id, first.skip) == ("a", 2, 2)
+    second = get_next_keyset_cursor(
+        [{"greeting_datetime": "a", "greeting_id": 1}],
+        "greeting_datetime",
+        "greeting_id",
+        True,
+        first,
+        first.skip,
+    )
+    assert second.skip == 3
@@ -0,0 +1,15 @@
+from square_administration.utils.rate_limit import TokenBucketRateLimiter
+
+
+def test_token_bucket_rate_limiter_burst_and_eviction():
+    rate_limiter = TokenBucketRateLimiter(capacity=2, refill_rate=0.5, max_keys=2)
+    assert rate_limiter.acquire("a") == 0
+    assert rate_limiter.acquire("a") == 0
+    retry_after = rate_limiter.acquire("a")
+    assert 0 < retry_after <= 2
+    assert rate_limiter.rejected_count == 1
+
+    rate_limiter.acquire("b")
+    rate_limiter.acquire("c")
+    # "a" was evicted and starts again with a full bucket.
+    assert rate_limiter.acquire("a") == 0
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from square_commons.api_utils import StandardResponse
+
+from square_administration.utils.serialization import ResponseSerializer
+
+
+class Item(BaseModel):
+    item_id: int
+
+
+def test_response_serializer_validates_once_and_writes_bytes():
+    serializer = ResponseSerializer(StandardResponse[Item])
+    response = serializer.get_response(
+        {"data": {"item_id": "1", "refresh_token": "secret"}, "message": "ok"},
+        status_code=201,
+    )
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert response.body == b'{"data":{"item_id":1},"message":"ok","log":null}'
+    assert serializer.to_json({"data": Item(item_id=2)}, exclude={"log"}) == (
+        b'{"data":{"item_id":2},"message":null}'
+    )
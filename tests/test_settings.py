@@ -0,0 +1,40 @@
+import pytest
+
+from square_administration.configuration import parse_config_bool, parse_config_list
+from square_administration.utils import settings
+
+
+def test_parse_config_values():
+    assert parse_config_list('["a@b.c", "d@e.f"]') == ["a@b.c", "d@e.f"]
+    assert parse_config_bool(" True ") is True
+    assert parse_config_bool("false") is False
+    with pytest.raises(ValueError):
+        parse_config_list("__import__('os')")
+    with pytest.raises(ValueError):
+        parse_config_bool("maybe")
+
+
+def test_reload_settings_swaps_or_keeps(monkeypatch, tmp_path):
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        "[ENVIRONMENT]\n"
+        'ADMIN_ALLOWED_EMAILS = ["new@example.com"]\n'
+        "COOKIE_DOMAIN = example.com\n"
+        f"SSL_CRT_FILE_PATH = {config_file}\n"
+        f"SSL_KEY_FILE_PATH = {config_file}\n"
+    )
+    monkeypatch.setattr(settings, "config_file_path", str(config_file))
+    monkeypatch.setattr(settings, "_settings", settings.get_settings())
+    is_https = settings.get_settings().is_https
+    settings.reload_settings()
+    # the SSL file paths now exist, but the running listener did not change.
+    assert settings.get_settings() == settings.Settings(
+        admin_allowed_emails=frozenset({"new@example.com"}),
+        cookie_domain="example.com",
+        is_https=is_https,
+    )
+
+    config_file.write_text("[ENVIRONMENT]\nADMIN_ALLOWED_EMAILS = not json\n")
+    reloaded_settings = settings.get_settings()
+    settings.reload_settings()
+    assert settings.get_settings() is reloaded_settings
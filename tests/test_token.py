@@ -0,0 +1,64 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import jwt
+
+from square_administration.utils import common, token
+
+
+def test_revoked_refresh_token_is_not_cached_by_in_flight_mint(monkeypatch):
+    common._set_app_id(1)
+    minted = asyncio.Event()
+    revoked = asyncio.Event()
+
+    async def fake_run_in_upstream_thread_pool(func, *args, **kwargs):
+        if func.__name__ == "validate_and_get_payload_from_token_v0":
+            return SimpleNamespace(
+                data=SimpleNamespace(
+                    main={"app_id": 1, "exp": time.time() + 3600},
+                )
+            )
+        # revoked while generate_access_token_v0 is in flight upstream.
+        minted.set()
+        await revoked.wait()
+        access_token = jwt.encode({"exp": time.time() + 3600}, "s" * 32)
+        return {"data": {"main": {"access_token": access_token}}}
+
+    monkeypatch.setattr(
+        token, "run_in_upstream_thread_pool", fake_run_in_upstream_thread_pool
+    )
+
+    async def main():
+        task = asyncio.create_task(token.generate_access_token("refresh-token"))
+        await minted.wait()
+        token.invalidate_refresh_token("refresh-token")
+        revoked.set()
+        await task
+
+    asyncio.run(main())
+    cache_key = token.get_token_hash("refresh-token")
+    assert token.global_object_access_token_cache.get(cache_key) is None
+    # the payload validated before the revocation was purged by it.
+    assert token.global_object_refresh_token_payload_cache.get(cache_key) is None
+
+    asyncio.run(token.get_refresh_token_payload("other-refresh-token"))
+    cache_key = token.get_token_hash("other-refresh-token")
+    assert token.global_object_refresh_token_payload_cache.get(cache_key) is not None
+
+
+def test_token_caches_are_off_with_several_workers(monkeypatch):
+    common._set_app_id(1)
+
+    async def fake_run_in_upstream_thread_pool(func, *args, **kwargs):
+        return SimpleNamespace(
+            data=SimpleNamespace(main={"app_id": 1, "exp": time.time() + 3600})
+        )
+
+    monkeypatch.setattr(
+        token, "run_in_upstream_thread_pool", fake_run_in_upstream_thread_pool
+    )
+    monkeypatch.setattr(token, "_is_token_cache_enabled", False)
+    asyncio.run(token.get_refresh_token_payload("worker-refresh-token"))
+    cache_key = token.get_token_hash("worker-refresh-token")
+    assert token.global_object_refresh_token_payload_cache.get(cache_key) is None